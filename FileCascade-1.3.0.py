@@ -1,32 +1,87 @@
+import time
+_STARTUP_T0 = time.perf_counter() # Time-to-first-window is measured from here
 import sys
 import os
 import shutil
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
 import pickle
 import math
 import re
-
+import errno
+import json
+import threading
+import argparse
+import signal
+import heapq
+import bisect
+from array import array
+from abc import ABC, abstractmethod
+from importlib.util import find_spec
+# Worker-only modules (concurrent.futures, multiprocessing, tarfile, zipfile,
+# gzip, zstandard, csv, mmap, ctypes, tempfile) are imported where they are
+# used, so they stay off the startup path.
 
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QLineEdit, QFileDialog, QListWidget, QListWidgetItem,
     QAbstractItemView, QTextEdit, QProgressBar, QScrollArea, QFrame,
-    QSizePolicy, QSpinBox, QCheckBox, QMessageBox,
+    QSizePolicy, QSpinBox, QCheckBox, QMessageBox, QComboBox, QSplitter,
+    QPlainTextEdit,
 )
 from PySide6.QtCore import (
     Qt, QThread, Signal, Slot, QMimeData, QByteArray, QTimer, QPoint
 )
-from PySide6.QtGui import QDrag, QIcon, QPixmap, QPainter, QColor, QLinearGradient
+from PySide6.QtGui import (
+    QDrag, QIcon, QPixmap, QPainter, QColor, QLinearGradient, QBrush, QFontDatabase
+)
 
 # --- Configuration ---
+APP_VERSION = "1.3.0"
 DEFAULT_TIME_THRESHOLD_MINUTES = 5
 DEFAULT_MANUAL_GROUP_COUNT = 5
 DEFAULT_FOLDER_NAME_PATTERN = "Run_{num}"
 DEFAULT_GROUP_TITLE_PREFIX = "Group"
 DEFAULT_EXTENSIONS = ".csv"
 CUSTOM_MIME_TYPE = "application/x-sorterapp-filelist"
+CACHE_DIR = Path.home() / ".filecascade"
+DEFAULT_TIMESTAMP_SOURCE = "mtime"
+CONTENT_TIMESTAMP_READ_BYTES = 8192 # Only the head of each file is mapped
+CONTENT_TIMESTAMP_POOL_MIN_FILES = 200 # Below this, extraction runs inline
+MOVE_JOURNAL_NAME = ".filecascade_move_journal.jsonl"
+PARTIAL_FILE_SUFFIX = ".fcpart"
+DEFAULT_ARCHIVE_LEVEL = 3
+DEFAULT_ARCHIVE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+DEFAULT_ARCHIVE_MEMORY_MB = 64 # Per worker process
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+DEFAULT_COPY_THREADS = 4 # Large files copied in parallel
+DEFAULT_SMALL_FILE_THREADS = 1 # Small-file units in directory/inode order; more threads interleave their reads
+COPY_LARGE_FILE_BYTES = 8 * 1024 * 1024 # Files at or above this are scheduled first, one per unit
+COPY_BATCH_MAX_FILES = 256
+COPY_BATCH_MAX_BYTES = 16 * 1024 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024 # Read size when bandwidth throttling is active
+SCAN_RUN_BLOCK_RECORDS = 4096 # Records per pickled block in a sorted run file
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_MAX_HIGHLIGHT = 5000 # Matches beyond this are still selectable/movable, just not painted
+SEARCH_HIGHLIGHT_COLOR = "#fff3a0"
+PLAN_FORMAT = "filecascade-copy-plan"
+PLAN_FILE_NAME = ".filecascade_plan.json"
+PLAN_STATE_SUFFIX = ".state" # Claims, progress and logs live beside the plan
+DEFAULT_PLAN_SHARDS = 16
+PLAN_SHARDS_PER_PROCESS = 4 # Extra shards let faster processes pick up the slack
+PLAN_PROGRESS_INTERVAL = 1.0 # Seconds between a shard's progress file writes
+PLAN_HEARTBEAT_SECONDS = 10 # A running shard touches its claim this often; --reclaim-after must be well above it
+PLAN_POLL_MS = 500
+PREVIEW_LINES = 50
+PREVIEW_READ_BYTES = 16 * 1024 # Only the head of the file is read
+PREVIEW_CACHE_BYTES = 8 * 1024 * 1024
+PREVIEW_PREFETCH = 3 # Neighbouring items loaded ahead on each side
+WATCH_STATE_NAME = ".filecascade_watch.json"
+WATCH_SETTLE_SECONDS = 2.0 # A file must stop changing for this long before it is grouped
+WATCH_POLL_SECONDS = 5.0 # Rescan interval when inotify is unavailable
+WATCH_TICK_SECONDS = 0.5
+WATCH_RETRY_SECONDS = 60 # Wait before retrying a group whose copy failed
+WATCH_MARK_SLACK_SECONDS = 120 # Tolerates coarse or skewed change times on network shares
 # --- End Configuration --
 
 def create_icon(shape, color="black"):
@@ -116,18 +171,531 @@ def create_app_icon():
     
     return QIcon(pixmap)
 
+
+def cached_icon(key, factory, size):
+    # Rendered icons are stored per version under CACHE_DIR, so later
+    # launches load a small PNG instead of painting gradients again.
+    path = CACHE_DIR / "icons" / f"{key}_{APP_VERSION}.png"
+    if path.is_file():
+        icon = QIcon(str(path))
+        if not icon.isNull():
+            return icon
+    icon = factory()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + PARTIAL_FILE_SUFFIX)
+        if icon.pixmap(size, size).save(str(tmp), "PNG"):
+            os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not cache icon '{key}': {e}")
+    return icon
+
+# --- Worker Control ---
+class OperationCancelled(Exception):
+    pass
+
+
+class TokenBucket:
+    # Rate is in units per second; 0 means unlimited. Holds at most one
+    # second of burst and lets large requests go into debt, so a single
+    # big read waits proportionally instead of stalling forever.
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self.rate = 0
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = max(0, rate)
+            self._tokens = min(self._tokens, float(self.rate))
+            self._stamp = time.monotonic()
+
+    def consume(self, amount):
+        # Returns how long the caller should wait before continuing
+        with self._lock:
+            if self.rate <= 0:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(float(self.rate), self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class WorkerControl:
+    # Shared between the UI/CLI and a running worker; workers call
+    # checkpoint()/throttle_*() at safe points between units of work.
+    def __init__(self, max_bytes_per_sec=0, max_stat_ops_per_sec=0):
+        self._running = threading.Event(); self._running.set()
+        self._cancelled = threading.Event()
+        self.byte_bucket = TokenBucket(max_bytes_per_sec)
+        self.stat_bucket = TokenBucket(max_stat_ops_per_sec)
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()
+
+    def is_paused(self):
+        return not self._running.is_set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def set_limits(self, max_bytes_per_sec=None, max_stat_ops_per_sec=None):
+        if max_bytes_per_sec is not None:
+            self.byte_bucket.set_rate(max_bytes_per_sec)
+        if max_stat_ops_per_sec is not None:
+            self.stat_bucket.set_rate(max_stat_ops_per_sec)
+
+    def checkpoint(self):
+        while not self._running.wait(0.2):
+            pass
+        if self._cancelled.is_set():
+            raise OperationCancelled()
+
+    def _wait(self, seconds):
+        if seconds > 0:
+            self._cancelled.wait(seconds)
+        self.checkpoint()
+
+    def throttle_bytes(self, count):
+        self._wait(self.byte_bucket.consume(count))
+
+    def throttle_stats(self, count=1):
+        self._wait(self.stat_bucket.consume(count))
+
+    def pace_bytes(self, count):
+        # Accounts for bytes already transferred; waits but never raises
+        wait = self.byte_bucket.consume(count)
+        if wait > 0:
+            self._cancelled.wait(wait)
+
+# --- Timestamp Sources ---
+TIMESTAMP_SOURCES = {
+    "mtime": "Modification time",
+    "ctime": "Change time (creation on Windows)",
+    "birthtime": "Birth time",
+    "content": "File content (CSV column / regex)",
+}
+
+CONTENT_TIMESTAMP_FORMATS = (
+    "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%d.%m.%Y %H:%M:%S",
+    "%d-%m-%Y %H:%M:%S", "%Y%m%d%H%M%S", "%Y%m%d_%H%M%S",
+)
+
+_STATX_BTIME = 0x800
+_AT_FDCWD = -100
+_statx = None # (libc statx function, struct statx class) once loaded, False if unavailable
+
+
+def _load_statx():
+    global _statx
+    import ctypes
+
+    class StatxTimestamp(ctypes.Structure):
+        _fields_ = [("tv_sec", ctypes.c_int64), ("tv_nsec", ctypes.c_uint32), ("reserved", ctypes.c_int32)]
+
+    class Statx(ctypes.Structure):
+        _fields_ = [
+            ("stx_mask", ctypes.c_uint32), ("stx_blksize", ctypes.c_uint32),
+            ("stx_attributes", ctypes.c_uint64), ("stx_nlink", ctypes.c_uint32),
+            ("stx_uid", ctypes.c_uint32), ("stx_gid", ctypes.c_uint32),
+            ("stx_mode", ctypes.c_uint16), ("spare0", ctypes.c_uint16),
+            ("stx_ino", ctypes.c_uint64), ("stx_size", ctypes.c_uint64),
+            ("stx_blocks", ctypes.c_uint64), ("stx_attributes_mask", ctypes.c_uint64),
+            ("stx_atime", StatxTimestamp), ("stx_btime", StatxTimestamp),
+            ("stx_ctime", StatxTimestamp), ("stx_mtime", StatxTimestamp),
+            ("spare", ctypes.c_uint64 * 18),
+        ]
+
+    try:
+        func = ctypes.CDLL(None, use_errno=True).statx
+        func.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.POINTER(Statx)]
+        func.restype = ctypes.c_int
+        _statx = (func, Statx)
+    except (OSError, AttributeError):
+        _statx = False
+
+
+def _statx_birthtime(path):
+    # Linux only exposes birth time through statx(2), which os.stat does not use.
+    if _statx is None:
+        _load_statx()
+    if not _statx:
+        return None
+    func, struct = _statx
+    buf = struct()
+    if func(_AT_FDCWD, os.fsencode(path), 0, _STATX_BTIME, buf) != 0:
+        return None
+    if not buf.stx_mask & _STATX_BTIME:
+        return None
+    return buf.stx_btime.tv_sec + buf.stx_btime.tv_nsec / 1e9
+
+
+def stat_timestamp(path, st, source):
+    if source == "ctime":
+        return st.st_ctime
+    if source == "birthtime":
+        birth = getattr(st, 'st_birthtime', None)
+        if birth is None and os.name == 'nt':
+            birth = st.st_ctime
+        if birth is None and sys.platform.startswith('linux'):
+            birth = _statx_birthtime(path)
+        if birth is not None:
+            return birth
+    return st.st_mtime
+
+
+def parse_timestamp_text(value, time_format=None):
+    value = value.strip().strip('"\'').strip()
+    if not value:
+        return None
+    if time_format:
+        try:
+            return datetime.strptime(value, time_format).timestamp()
+        except ValueError:
+            return None
+    if re.fullmatch(r'\d{9,13}(\.\d+)?', value):
+        # Epoch seconds or milliseconds, both common in instrument logs
+        num = float(value)
+        return num / 1000.0 if num > 1e11 else num
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+    for fmt in CONTENT_TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def extract_content_timestamp(path, column=None, regex=None, time_format=None,
+                              read_bytes=CONTENT_TIMESTAMP_READ_BYTES):
+    import csv, mmap
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return None
+        length = min(size, read_bytes)
+        with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mm:
+            head = mm[:length]
+    text = head.decode('utf-8', errors='replace').lstrip('\ufeff')
+    if regex:
+        m = re.search(regex, text, re.MULTILINE)
+        if not m:
+            return None
+        return parse_timestamp_text(m.group(1) if m.groups() else m.group(0), time_format)
+    lines = text.splitlines()
+    if length < size and lines:
+        lines = lines[:-1] # Last line may be cut off by the read window
+    if not lines:
+        return None
+    try:
+        dialect = csv.Sniffer().sniff(lines[0], delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    rows = csv.reader(lines, dialect)
+    column = (column or "0").strip()
+    if column.lstrip('-').isdigit():
+        idx = int(column)
+    else:
+        header = [h.strip().lower() for h in next(rows, [])]
+        if column.lower() not in header:
+            return None
+        idx = header.index(column.lower())
+    for row in rows:
+        if -len(row) <= idx < len(row):
+            ts = parse_timestamp_text(row[idx], time_format)
+            if ts is not None:
+                return ts
+    return None
+
+
+def _content_timestamp_job(job):
+    # Runs in a worker process; must stay importable at module level.
+    path_str, column, regex, time_format = job
+    try:
+        return path_str, extract_content_timestamp(path_str, column, regex, time_format), None
+    except Exception as e:
+        return path_str, None, str(e)
+
+
+class TimestampCache:
+    def __init__(self, cache_file=None):
+        self.cache_file = Path(cache_file) if cache_file else CACHE_DIR / "timestamp_cache.pkl"
+        self.entries = {}
+        self.loaded = False
+        self.dirty = False
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+            if isinstance(data, dict):
+                self.entries = data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Timestamp cache unreadable, starting fresh: {e}")
+
+    def get(self, path_str, st, options_key):
+        entry = self.entries.get(path_str)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns and entry[2] == options_key:
+            return entry[3]
+        return None
+
+    def put(self, path_str, st, options_key, ts):
+        self.entries[path_str] = (st.st_size, st.st_mtime_ns, options_key, ts)
+        self.dirty = True
+
+    def prune(self, root, seen):
+        # Drops entries under the scanned root that the scan no longer found;
+        # paths are absolute so other roots' entries are left alone
+        prefix = os.path.join(os.fspath(root), "")
+        stale = [p for p in self.entries if p.startswith(prefix) and p not in seen]
+        for p in stale:
+            del self.entries[p]
+        if stale:
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.cache_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"Could not save timestamp cache: {e}")
+
+
+def iter_matching_files(root, extensions, control=None, skip=None):
+    # `skip` is a directory below root whose subtree is not walked at all
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        if control is not None:
+            control.throttle_stats()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path != skip:
+                        stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                    if control is not None:
+                        control.throttle_stats()
+                    yield entry.path, entry.stat()
+            except OSError:
+                continue
+
+# --- External Sort ---
+class ExternalSortedRecords:
+    # Holds scan records as compact (ts, path, size) tuples. Once more than
+    # `budget` are buffered they are sorted and spilled to a run file;
+    # iterating k-way merges all runs, so only one block per run is in memory.
+    def __init__(self, budget, tmp_dir=None):
+        self.budget = max(1, budget)
+        self.buffer = []
+        self.runs = []
+        self.count = 0
+        import tempfile
+        self._tmp_dir = tempfile.mkdtemp(prefix="filecascade_runs_", dir=tmp_dir)
+
+    def add(self, ts, path_str, size):
+        self.buffer.append((ts, path_str, size))
+        self.count += 1
+        if len(self.buffer) >= self.budget:
+            self._spill()
+
+    def _spill(self):
+        self.buffer.sort()
+        run_path = os.path.join(self._tmp_dir, f"run_{len(self.runs):05d}.pkl")
+        with open(run_path, 'wb') as f:
+            for i in range(0, len(self.buffer), SCAN_RUN_BLOCK_RECORDS):
+                pickle.dump(self.buffer[i:i + SCAN_RUN_BLOCK_RECORDS], f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.runs.append(run_path)
+        self.buffer = []
+
+    @staticmethod
+    def _read_run(run_path):
+        with open(run_path, 'rb') as f:
+            while True:
+                try:
+                    block = pickle.load(f)
+                except EOFError:
+                    return
+                yield from block
+
+    def __iter__(self):
+        self.buffer.sort()
+        merged = heapq.merge(self.buffer, *(self._read_run(p) for p in self.runs))
+        for ts, path_str, size in merged:
+            yield {
+                'path': Path(path_str),
+                'mod_time_ts': ts,
+                'mod_time_dt': datetime.fromtimestamp(ts),
+                'size': size,
+            }
+
+    def close(self):
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        self.buffer = []
+        self.runs = []
+
+# --- Search Index ---
+class FileSearchIndex:
+    # Built once per scan. Names are joined into one NUL-separated blob so
+    # substring queries run as C-level str.find with a bisect back to the
+    # file; a sorted name array answers prefix queries ("^abc"). Directory
+    # paths are few, so they are matched directly and expanded to their files.
+    # They are kept relative to `root`, so a query that happens to be part of
+    # the source path does not match every file.
+    def __init__(self, paths, root=None):
+        self.paths = list(paths)
+        self.names = []
+        dirs = {}
+        for i, p in enumerate(self.paths):
+            full = os.fspath(p).lower()
+            cut = full.rfind(os.sep)
+            self.names.append(full[cut + 1:])
+            dirs.setdefault(full[:cut], []).append(i)
+        prefix = os.path.join(os.fspath(root), "").lower() if root is not None else ""
+        self.dirs = {}
+        for d, ids in dirs.items():
+            rel = d[len(prefix):] if prefix and (d + os.sep).startswith(prefix) else d
+            if rel:
+                self.dirs[rel] = array('I', ids)
+        self._blob = '\0'.join(self.names)
+        self._starts = array('Q', [0])
+        offset = 0
+        for name in self.names[:-1]:
+            offset += len(name) + 1
+            self._starts.append(offset)
+        order = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self.sorted_names = [self.names[i] for i in order]
+        self.sorted_ids = array('I', order)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _name_prefix(self, prefix):
+        lo = bisect.bisect_left(self.sorted_names, prefix)
+        hi = bisect.bisect_left(self.sorted_names, prefix + '\uffff')
+        return set(self.sorted_ids[lo:hi])
+
+    def _name_substring(self, query):
+        if len(query) < 3:
+            # Very short queries hit most files; a flat scan beats per-hit bisects
+            return {i for i, name in enumerate(self.names) if query in name}
+        hits = set()
+        blob, starts = self._blob, self._starts
+        pos = blob.find(query)
+        while pos != -1:
+            i = bisect.bisect_right(starts, pos) - 1
+            hits.add(i)
+            # Continue from the next name; one hit per file is enough
+            pos = blob.find(query, starts[i + 1]) if i + 1 < len(starts) else -1
+        return hits
+
+    def search(self, query):
+        query = query.strip().lower()
+        if not query:
+            return []
+        if query.startswith('^'):
+            return sorted(self._name_prefix(query[1:]))
+        hits = self._name_substring(query)
+        for d, ids in self.dirs.items():
+            if query in d:
+                hits.update(ids)
+        return sorted(hits)
+
 # --- FileScannerWorker ---
 class FileScannerWorker(QThread):
     progress = Signal(str)
     result = Signal(list)
+    index_ready = Signal(object) # FileSearchIndex over the scanned files
     finished = Signal()
 
-    def __init__(self, source_dir, extensions): 
+    def __init__(self, source_dir, extensions, timestamp_source=DEFAULT_TIMESTAMP_SOURCE,
+                 content_column="", content_regex="", timestamp_cache=None, control=None,
+                 memory_budget=0):
         super().__init__()
         self.source_dir = source_dir
         self.extensions = [ext.strip().lower() for ext in extensions if ext.strip()] 
+        self.timestamp_source = timestamp_source if timestamp_source in TIMESTAMP_SOURCES else DEFAULT_TIMESTAMP_SOURCE
+        self.content_column = content_column.strip()
+        self.content_regex = content_regex.strip()
+        self.timestamp_cache = timestamp_cache
+        self.control = control or WorkerControl()
+        self.memory_budget = memory_budget
+        self.sorted_records = None
         self.files_data = []
 
+    def _add_record(self, path_str, st, ts):
+        if self.sorted_records is not None:
+            self.sorted_records.add(ts, path_str, st.st_size)
+            return
+        self.files_data.append({
+            'path': Path(path_str),
+            'mod_time_ts': ts,
+            'mod_time_dt': datetime.fromtimestamp(ts),
+            'size': st.st_size,
+        })
+
+    def _discard_sorted_records(self):
+        if self.sorted_records is not None:
+            self.sorted_records.close()
+            self.sorted_records = None
+
+    def _extract_content_timestamps(self, pending):
+        options_key = (self.content_column, self.content_regex)
+        jobs = [(path_str, self.content_column, self.content_regex or None, None) for path_str, _ in pending]
+        stats = dict(pending)
+        self.progress.emit(f"Extracting content timestamps from {len(jobs)} files...")
+        if len(jobs) >= CONTENT_TIMESTAMP_POOL_MIN_FILES:
+            from concurrent.futures import ProcessPoolExecutor
+            workers = os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(_content_timestamp_job, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+                results = list(results)
+        else:
+            results = [_content_timestamp_job(job) for job in jobs]
+        fallbacks = 0
+        for path_str, ts, err in results:
+            st = stats[path_str]
+            if err:
+                self.progress.emit(f"Error reading timestamp from {path_str}: {err}")
+            if ts is None:
+                fallbacks += 1
+                ts = st.st_mtime
+            elif self.timestamp_cache is not None:
+                self.timestamp_cache.put(path_str, st, options_key, ts)
+            self._add_record(path_str, st, ts)
+        if fallbacks:
+            self.progress.emit(f"No content timestamp found in {fallbacks} files; used modification time.")
+
     def run(self):
         if not self.extensions:
             self.progress.emit("Error: No valid file extensions specified.")
@@ -136,53 +704,482 @@ class FileScannerWorker(QThread):
             return
 
         ext_str = ', '.join(self.extensions)
-        self.progress.emit(f"Scanning '{self.source_dir}' for files matching: {ext_str}...")
+        self.progress.emit(f"Scanning '{self.source_dir}' for files matching: {ext_str} "
+                           f"(timestamp: {TIMESTAMP_SOURCES[self.timestamp_source]})...")
         try:
-            source_path = Path(self.source_dir)
             count = 0
-            # Iterate through all files and filter by extension
-            for file_path in source_path.rglob('*'):
-                if file_path.is_file() and file_path.suffix.lower() in self.extensions:
-                    try:
-                        mod_ts = os.path.getmtime(file_path)
-                        mod_dt = datetime.fromtimestamp(mod_ts)
-                        self.files_data.append({
-                           'path': file_path,
-                            'mod_time_ts': mod_ts,
-                            'mod_time_dt': mod_dt
-                        })
-                        count += 1
-                        if count % 100 == 0:
-                            self.progress.emit(f"Scanned {count} matching files...")
-                    except Exception as e:
-                        self.progress.emit(f"Error accessing {file_path}: {e}")
-
+            pending = []
+            from_content = self.timestamp_source == "content"
+            options_key = (self.content_column, self.content_regex)
+            use_cache = from_content and self.timestamp_cache is not None
+            seen = set()
+            if use_cache:
+                self.timestamp_cache.load()
+            if self.memory_budget > 0:
+                self.sorted_records = ExternalSortedRecords(self.memory_budget)
+            # Absolute paths keep cache entries valid whatever the working directory
+            root = os.path.abspath(self.source_dir)
+            for path_str, st in iter_matching_files(root, self.extensions, self.control):
+                try:
+                    if use_cache:
+                        seen.add(path_str)
+                    if from_content:
+                        ts = self.timestamp_cache.get(path_str, st, options_key) if self.timestamp_cache is not None else None
+                        if ts is None:
+                            pending.append((path_str, st))
+                        else:
+                            self._add_record(path_str, st, ts)
+                    else:
+                        self._add_record(path_str, st, stat_timestamp(path_str, st, self.timestamp_source))
+                    count += 1
+                    if count % 100 == 0:
+                        self.progress.emit(f"Scanned {count} matching files...")
+                    if self.sorted_records is not None and len(pending) >= self.memory_budget:
+                        self._extract_content_timestamps(pending)
+                        pending = []
+                except Exception as e:
+                    self.progress.emit(f"Error accessing {path_str}: {e}")
+
+            if pending:
+                self.control.checkpoint()
+                self._extract_content_timestamps(pending)
+            if use_cache:
+                self.timestamp_cache.prune(root, seen)
+                self.timestamp_cache.save()
+            if self.sorted_records is not None:
+                self.progress.emit(f"Scan complete. Found {self.sorted_records.count} files matching {ext_str} "
+                                   f"({len(self.sorted_records.runs)} sorted runs on disk).")
+                return # The caller streams groups from self.sorted_records
             self.files_data.sort(key=lambda x: x['mod_time_ts'])
             self.progress.emit(f"Scan complete. Found {len(self.files_data)} files matching {ext_str}.")
+            self.index_ready.emit(FileSearchIndex((fi['path'] for fi in self.files_data), root))
             self.result.emit(self.files_data)
+        except OperationCancelled:
+            self.progress.emit(f"Scan cancelled after {count} files.")
+            self._discard_sorted_records()
+            self.result.emit([])
         except Exception as e:
             self.progress.emit(f"Error during scanning: {e}")
+            self._discard_sorted_records()
             self.result.emit([])
         finally:
             self.finished.emit()
 
+# --- Move Journal ---
+class MoveJournal:
+    # Cross-device moves are copy + fsync + unlink; each one is bracketed by
+    # begin/done records so an interrupted run can be reconciled later.
+    def __init__(self, dest_dir, name=MOVE_JOURNAL_NAME):
+        self.path = Path(dest_dir) / name
+        self._fh = None
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return self.path.exists()
+
+    def pending(self):
+        open_moves = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue # Torn final line from a crash
+                    key = (rec.get('src'), rec.get('dest'))
+                    if rec.get('op') == 'begin':
+                        open_moves[key] = rec
+                    elif rec.get('op') == 'done':
+                        open_moves.pop(key, None)
+        except FileNotFoundError:
+            pass
+        return [(Path(src), Path(dest)) for src, dest in open_moves]
+
+    def _write(self, rec, sync):
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.path, 'a', encoding='utf-8')
+            self._fh.write(json.dumps(rec) + "\n")
+            self._fh.flush()
+            if sync:
+                os.fsync(self._fh.fileno())
+
+    def begin(self, src, dest):
+        self._write({'op': 'begin', 'src': str(src), 'dest': str(dest)}, sync=True)
+
+    def done(self, src, dest):
+        self._write({'op': 'done', 'src': str(src), 'dest': str(dest)}, sync=False)
+
+    def close(self, remove=False):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if remove:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def fsync_directory(path):
+    # Makes renames/creates inside `path` durable; directories cannot be opened on Windows
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def recover_move_journal(dest_dir, report=print, name=MOVE_JOURNAL_NAME):
+    journal = MoveJournal(dest_dir, name)
+    if not journal.exists():
+        return 0
+    recovered = 0
+    for src, dest in journal.pending():
+        partial = dest.with_name(dest.name + PARTIAL_FILE_SUFFIX)
+        try:
+            if partial.exists():
+                partial.unlink()
+            if src.exists() and dest.exists():
+                # dest only appears after a synced copy, so a matching dest means only the unlink was lost
+                s_st, d_st = src.stat(), dest.stat()
+                if s_st.st_size == d_st.st_size and s_st.st_mtime_ns == d_st.st_mtime_ns:
+                    with open(dest, 'rb') as f:
+                        os.fsync(f.fileno())
+                    fsync_directory(dest.parent) # Only drop the source once dest is on disk
+                    src.unlink()
+            recovered += 1
+        except OSError as e:
+            report(f"ERROR recovering move of '{src}': {e}")
+    journal.close(remove=True)
+    report(f"Recovered {recovered} interrupted move(s) from journal.")
+    return recovered
+
+
+# --- Archive Output ---
+ARCHIVE_FORMATS = {
+    "folder": "Folders",
+    "tar": ".tar",
+    "tar.gz": ".tar.gz",
+    "tar.zst": ".tar.zst",
+    "zip": ".zip",
+}
+
+
+def available_archive_formats():
+    # find_spec checks for the optional zstandard package without importing it
+    return [fmt for fmt in ARCHIVE_FORMATS if fmt != "tar.zst" or find_spec("zstandard") is not None]
+
+
+def _zstd_window_log(memory_mb):
+    # Keep the compressor window to about a quarter of the per-worker budget
+    budget = max(1, memory_mb) * 1024 * 1024 // 4
+    return max(10, min(27, budget.bit_length() - 1))
+
+
+class _PacedReader:
+    # File wrapper that reports each read to `pace`, which may sleep to hold a bandwidth limit
+    def __init__(self, f, pace):
+        self._f = f
+        self._pace = pace
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        if data:
+            self._pace(len(data))
+        return data
+
+
+def write_group_archive(files, archive_path, fmt, level=DEFAULT_ARCHIVE_LEVEL, memory_mb=DEFAULT_ARCHIVE_MEMORY_MB,
+                        pace=None):
+    # Streams every file of one group into a single archive; written to a
+    # partial name first so a finished archive never appears half-written.
+    import tarfile, zipfile
+    pace = pace or (lambda _count: None)
+    archive_path = Path(archive_path)
+    partial = archive_path.with_name(archive_path.name + PARTIAL_FILE_SUFFIX)
+    written, errors = 0, []
+    try:
+        with open(partial, 'wb') as raw:
+            if fmt == "zip":
+                compression = zipfile.ZIP_DEFLATED if level > 0 else zipfile.ZIP_STORED
+                with zipfile.ZipFile(raw, 'w', compression=compression,
+                                     compresslevel=min(level, 9) if level > 0 else None, allowZip64=True) as zf:
+                    for fpath in files:
+                        try:
+                            # As ZipFile.write, but reading through the pacer
+                            zinfo = zipfile.ZipInfo.from_file(fpath, arcname=Path(fpath).name)
+                            zinfo.compress_type = compression
+                            zinfo._compresslevel = zf.compresslevel
+                            with open(fpath, 'rb') as src, zf.open(zinfo, 'w') as dst:
+                                shutil.copyfileobj(_PacedReader(src, pace), dst, ARCHIVE_CHUNK_SIZE)
+                            written += 1
+                        except OSError as e:
+                            errors.append(f"ERROR archiving '{Path(fpath).name}': {e}")
+            else:
+                if fmt == "tar.zst":
+                    import zstandard
+                    params = zstandard.ZstdCompressionParameters.from_level(
+                        level, window_log=_zstd_window_log(memory_mb), threads=0)
+                    stream = zstandard.ZstdCompressor(compression_params=params).stream_writer(raw, closefd=False)
+                elif fmt == "tar.gz":
+                    import gzip
+                    stream = gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=max(1, min(level, 9)))
+                else:
+                    stream = None
+                # Symlinked sources are stored as file contents, like folder copies and zip
+                tar = tarfile.open(fileobj=stream or raw, mode='w|', bufsize=ARCHIVE_CHUNK_SIZE, dereference=True)
+                with tar:
+                    for fpath in files:
+                        try:
+                            tarinfo = tar.gettarinfo(fpath, arcname=Path(fpath).name)
+                            if tarinfo.isreg():
+                                with open(fpath, 'rb') as src:
+                                    tar.addfile(tarinfo, _PacedReader(src, pace))
+                            else:
+                                tar.addfile(tarinfo)
+                            written += 1
+                        except OSError as e:
+                            errors.append(f"ERROR archiving '{Path(fpath).name}': {e}")
+                if stream is not None:
+                    stream.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(partial, archive_path)
+    except Exception:
+        if partial.exists():
+            partial.unlink()
+        raise
+    return written, errors
+
+
+_archive_rate = None # Per-process bytes/s budget shared with the parent, 0 = unlimited
+_archive_bucket = None
+
+
+def _init_archive_worker(rate):
+    global _archive_rate, _archive_bucket
+    _archive_rate, _archive_bucket = rate, TokenBucket(rate.value)
+
+
+def _pace_archive_read(count):
+    # The parent updates the shared rate, so limit changes reach running archives
+    rate = _archive_rate.value
+    if rate != _archive_bucket.rate:
+        _archive_bucket.set_rate(rate)
+    deadline = time.monotonic() + _archive_bucket.consume(count)
+    while _archive_rate.value > 0 and time.monotonic() < deadline: # Lifting the limit ends the wait
+        time.sleep(min(0.2, deadline - time.monotonic()))
+
+
+def _archive_group_job(job):
+    # Runs in a worker process; must stay importable at module level.
+    files, archive_path, fmt, level, memory_mb = job
+    try:
+        written, errors = write_group_archive(files, archive_path, fmt, level, memory_mb,
+                                              _pace_archive_read if _archive_rate is not None else None)
+        return archive_path, written, errors
+    except Exception as e:
+        return archive_path, 0, [f"ERROR writing archive '{Path(archive_path).name}': {e}"]
+
+
+# --- Copy Scheduling ---
+class CopyTask:
+    __slots__ = ('src', 'dest', 'st', 'target_dev')
+
+    def __init__(self, src, dest, st, target_dev):
+        self.src = src
+        self.dest = dest
+        self.st = st
+        self.target_dev = target_dev
+
+
+def schedule_copy_tasks(tasks):
+    # Large files go first so the parallel tail stays short; small files are
+    # ordered by directory and inode for sequential reads and packed into
+    # shared units so per-file overhead is paid once per batch.
+    large = sorted((t for t in tasks if t.st.st_size >= COPY_LARGE_FILE_BYTES), key=lambda t: -t.st.st_size)
+    small = sorted((t for t in tasks if t.st.st_size < COPY_LARGE_FILE_BYTES),
+                   key=lambda t: (t.src.parent.as_posix(), t.st.st_ino))
+    units = [[t] for t in large]
+    batch, batch_bytes = [], 0
+    for t in small:
+        if batch and (len(batch) >= COPY_BATCH_MAX_FILES or batch_bytes + t.st.st_size > COPY_BATCH_MAX_BYTES):
+            units.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(t)
+        batch_bytes += t.st.st_size
+    if batch:
+        units.append(batch)
+    return units
+
+
 # --- FileCopyWorker --- 
 class FileCopyWorker(QThread):
     progress = Signal(int, int, str)
     finished = Signal(bool, str)
 
     def __init__(self, groups_data, dest_dir,
-group_folder_names):
+group_folder_names, move=False, archive_format="folder",
+                 archive_level=DEFAULT_ARCHIVE_LEVEL, archive_workers=DEFAULT_ARCHIVE_WORKERS,
+                 archive_memory_mb=DEFAULT_ARCHIVE_MEMORY_MB, copy_threads=DEFAULT_COPY_THREADS, control=None,
+                 journal_name=MOVE_JOURNAL_NAME, small_file_threads=DEFAULT_SMALL_FILE_THREADS):
         super().__init__()
         self.groups_data = groups_data
         self.dest_dir = Path(dest_dir)
         self.group_folder_names = group_folder_names
+        self.move = move and archive_format == "folder"
+        self.archive_format = archive_format
+        self.archive_level = archive_level
+        self.archive_workers = max(1, archive_workers)
+        self.archive_memory_mb = archive_memory_mb
+        self.copy_threads = max(1, copy_threads)
+        self.small_file_threads = max(1, small_file_threads)
+        self.control = control or WorkerControl()
+        self.journal = MoveJournal(self.dest_dir, journal_name)
+
+    def _move_file(self, fpath, dest, target_dev, st):
+        if st.st_dev == target_dev:
+            try:
+                os.replace(fpath, dest) # Atomic and metadata-only within a device
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        partial = dest.with_name(dest.name + PARTIAL_FILE_SUFFIX)
+        self.journal.begin(fpath, dest)
+        try:
+            self._copy_data(fpath, partial, st, preserve_all=True)
+            with open(partial, 'rb+') as f:
+                os.fsync(f.fileno())
+            os.replace(partial, dest)
+            fsync_directory(dest.parent) # The rename must be durable before the source goes
+        except (OSError, OperationCancelled):
+            if partial.exists():
+                partial.unlink()
+            self.journal.done(fpath, dest) # Source untouched; nothing to recover
+            raise
+        fpath.unlink()
+        self.journal.done(fpath, dest)
 
     def sanitize_folder_name(self, name):
         name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '', name)
         name = name.strip('. ')
         return name or "Invalid_Name"
 
+    def _copy_data(self, src, dest, st, preserve_all=False):
+        if self.control.byte_bucket.rate > 0 and st.st_size >= COPY_CHUNK_SIZE:
+            # Chunked so the bandwidth limit and pause/cancel apply mid-file;
+            # a cancelled copy only ever leaves a partial file, never a short dest.
+            partial = dest.with_name(dest.name + PARTIAL_FILE_SUFFIX)
+            try:
+                with open(src, 'rb') as fsrc, open(partial, 'wb') as fdst:
+                    while True:
+                        chunk = fsrc.read(COPY_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        self.control.throttle_bytes(len(chunk))
+                        fdst.write(chunk)
+                shutil.copystat(src, partial)
+                os.replace(partial, dest)
+            except BaseException:
+                if partial.exists():
+                    partial.unlink()
+                raise
+            return
+        if preserve_all or st.st_size >= COPY_LARGE_FILE_BYTES:
+            shutil.copy2(src, dest)
+        else:
+            # Small files skip copystat's flags and xattrs; mode and timestamps are kept as with copy2
+            shutil.copyfile(src, dest)
+            shutil.copymode(src, dest)
+            os.utime(dest, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.control.pace_bytes(st.st_size)
+
+    def _transfer_file(self, task):
+        if self.move:
+            self._move_file(task.src, task.dest, task.target_dev, task.st)
+        else:
+            self._copy_data(task.src, task.dest, task.st)
+
+    def _transfer_unit(self, unit):
+        done, unit_errors = 0, []
+        for task in unit:
+            try:
+                self.control.checkpoint()
+                self._transfer_file(task)
+                done += 1
+            except OperationCancelled:
+                return done, unit_errors, True
+            except Exception as e:
+                unit_errors.append(f"'{task.src.name}': {e}")
+        return done, unit_errors, False
+
+    def _run_archives(self, total_files):
+        ext = ARCHIVE_FORMATS[self.archive_format]
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        # Groups whose names sanitize alike share one archive, as they would share one
+        # folder; separate jobs would overwrite each other's output and partial file.
+        archives = {}
+        for idx, group in enumerate(self.groups_data):
+            files = [str(p) for p in group if isinstance(p, Path)]
+            if not files:
+                continue
+            name = self.sanitize_folder_name(self.group_folder_names[idx])
+            members = archives.setdefault(name, {})
+            for fpath in files:
+                arcname = os.path.basename(fpath)
+                if arcname in members:
+                    # The later file wins, as with sequential copying
+                    self.progress.emit(0, total_files, f"'{arcname}' in '{name}{ext}' replaces an earlier file with the same name")
+                    total_files -= 1
+                members[arcname] = fpath
+        jobs = [(list(members.values()), str(self.dest_dir / f"{name}{ext}"), self.archive_format,
+                 self.archive_level, self.archive_memory_mb) for name, members in archives.items()]
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+        written, errors = 0, total_files - sum(len(j[0]) for j in jobs)
+        workers = min(self.archive_workers, len(jobs)) or 1
+        self.progress.emit(0, total_files, f"Writing {len(jobs)} {ext} archives with {workers} worker(s)...")
+        cancelled = False
+        # The bandwidth limit is split evenly between the worker processes
+        rate = multiprocessing.Value('d', self.control.byte_bucket.rate / workers, lock=False)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_archive_worker, initargs=(rate,)) as pool:
+            # Submitted a few at a time so pause/cancel take effect between groups
+            queue = list(reversed(jobs))
+            running = set()
+            while queue or running:
+                while queue and len(running) < workers and not cancelled:
+                    try:
+                        self.control.checkpoint()
+                    except OperationCancelled:
+                        cancelled = True
+                        break
+                    running.add(pool.submit(_archive_group_job, queue.pop()))
+                if not running:
+                    break
+                done, running = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                rate.value = self.control.byte_bucket.rate / workers
+                for fut in done:
+                    archive_path, count, errs = fut.result()
+                    written += count
+                    errors += len(errs)
+                    for msg in errs:
+                        self.progress.emit(written, total_files, msg)
+                    self.progress.emit(written, total_files, f"Archived '{Path(archive_path).name}' ({count} files). "
+                                                             f"{written}/{total_files} files written...")
+        if cancelled:
+            self.finished.emit(False, f"Archive cancelled. {written}/{total_files} files written. "
+                                      f"Completed archives are kept, but running it again rewrites every archive.")
+            return
+        final = f"Archive finished. {written}/{total_files} files written to {len(jobs)} archives."
+        if errors:
+            self.finished.emit(False, final + f" {errors} errors.")
+        else:
+            self.finished.emit(True, final)
+
     def run(self):
         total_files = sum(len(g) for g in self.groups_data)
         copied = 0
@@ -192,8 +1189,20 @@ group_folder_names):
             self.progress.emit(0, total_files, f"ERROR: {msg}")
             self.finished.emit(False, msg)
             return
-        self.progress.emit(copied, total_files, "Starting copy process...")
+        if self.archive_format != "folder":
+            try:
+                self._run_archives(total_files)
+            except Exception as e:
+                self.finished.emit(False, f"Critical error: {e}")
+            return
+        verb, verb_ing, verb_past = ("move", "moving", "Moved") if self.move else ("copy", "copying", "Copied")
+        if self.journal.exists():
+            recover_move_journal(self.dest_dir, lambda m: self.progress.emit(0, total_files, m), self.journal.path.name)
+        self.progress.emit(copied, total_files, f"Starting {verb} process...")
         try:
+            tasks = []
+            planned = {} # dest -> (source, target_dev, existing entries of its folder)
+            already_done = 0
             for idx, group in enumerate(self.groups_data):
                 if not group:
                    continue
@@ -202,6 +1211,9 @@ group_folder_names):
                 target = self.dest_dir / folder_name
                 try:
                     target.mkdir(parents=True, exist_ok=True)
+                    target_dev = target.stat().st_dev
+                    with os.scandir(target) as it:
+                        existing = {e.name: e for e in it}
                     log_name = f"'{raw_name}'" if raw_name == folder_name else f"'{raw_name}' (sanitized to '{folder_name}')"
                     self.progress.emit(copied, total_files, f"Using folder: {log_name}")
                 except Exception as e:
@@ -209,35 +1221,901 @@ group_folder_names):
                     errors += len(group)
                     continue
                 for fpath in group:
+                    # Plan entries arrive as (source, destination name) pairs
+                    fpath, dest_name = fpath if isinstance(fpath, tuple) else (fpath, getattr(fpath, 'name', None))
                     if not isinstance(fpath, Path):
                        self.progress.emit(copied, total_files, f"Skipping invalid item: {type(fpath)}")
                        errors += 1
                        continue
-                    dest = target / fpath.name
-                    try:
-                        if not fpath.exists():
-                            self.progress.emit(copied, total_files, f"ERROR missing '{fpath.name}'")
-                            errors += 1
-                            continue
-                        shutil.copy2(fpath, dest)
-                        copied += 1
-                        if copied % 10 == 0 or \
-                           copied == total_files:
-                            self.progress.emit(copied, total_files, f"Copied {copied}/{total_files} files...")
-                    except Exception as e:
-                        self.progress.emit(copied, total_files, f"ERROR copying '{fpath.name}': {e}")
-                        errors += 1
-            final = f"Copy finished. "
-            final += f"{copied}/{total_files} files copied."
+                    dest = target / dest_name
+                    if dest in planned:
+                        # Same name twice in one folder: the later file wins, as with sequential copying
+                        self.progress.emit(copied, total_files, f"'{dest_name}' in '{folder_name}' replaces an earlier file with the same name")
+                        del planned[dest]
+                        total_files -= 1
+                    planned[dest] = (fpath, target_dev, existing)
+
+            # Resume checks only see the winning file of each destination, so
+            # rerunning a finished copy never puts an overwritten duplicate back
+            for dest, (fpath, target_dev, existing) in planned.items():
+                try:
+                    self.control.throttle_stats()
+                    st = fpath.stat()
+                except OSError:
+                    if self.move and dest.name in existing:
+                        already_done += 1 # Moved by an earlier, interrupted run
+                        continue
+                    self.progress.emit(copied, total_files, f"ERROR missing '{fpath.name}'")
+                    errors += 1
+                    continue
+                if not self.move and dest.name in existing:
+                    d_st = existing[dest.name].stat()
+                    if d_st.st_size == st.st_size and d_st.st_mtime_ns == st.st_mtime_ns:
+                        already_done += 1 # Copied by an earlier, interrupted run
+                        continue
+                tasks.append(CopyTask(fpath, dest, st, target_dev))
+
+            from concurrent.futures import ThreadPoolExecutor, as_completed
+            units = schedule_copy_tasks(tasks)
+            if already_done:
+                copied += already_done
+                self.progress.emit(copied, total_files, f"Resuming: {already_done} files already in place.")
+            self.progress.emit(copied, total_files, f"Scheduled {total_files - copied} files in {len(units)} work units.")
+            cancelled = False
+            # Small-file units queue in scan order on their own pool so reads stay sequential
+            with ThreadPoolExecutor(max_workers=self.copy_threads) as pool, \
+                 ThreadPoolExecutor(max_workers=self.small_file_threads) as small_pool:
+                futures = [(pool if len(unit) == 1 and unit[0].st.st_size >= COPY_LARGE_FILE_BYTES else small_pool)
+                           .submit(self._transfer_unit, unit) for unit in units]
+                for fut in as_completed(futures):
+                    done, unit_errors, unit_cancelled = fut.result()
+                    cancelled = cancelled or unit_cancelled
+                    copied += done
+                    errors += len(unit_errors)
+                    for msg in unit_errors:
+                        self.progress.emit(copied, total_files, f"ERROR {verb_ing} {msg}")
+                    self.progress.emit(copied, total_files, f"{verb_past} {copied}/{total_files} files...")
+            self.journal.close(remove=not self.journal.pending())
+            if cancelled:
+                self.finished.emit(False, f"{verb.capitalize()} cancelled. {copied}/{total_files} files {verb_past.lower()}. "
+                                          f"Run it again to resume.")
+                return
+            final = f"{verb.capitalize()} finished. "
+            final += f"{copied}/{total_files} files {verb_past.lower()}."
             if errors:
                 final += f" {errors} errors."
                 self.finished.emit(False, final)
             else:
                 self.finished.emit(True, final)
+        except OperationCancelled:
+            self.journal.close()
+            self.finished.emit(False, f"{verb.capitalize()} cancelled before any files were {verb_past.lower()}.")
         except Exception as e:
+            self.journal.close()
             self.finished.emit(False, f"Critical error: {e}")
 
 
+# --- Copy Plan ---
+class CopyPlan:
+    # A self-contained manifest of [source, folder, name] entries. Any process
+    # or host that sees the same paths can execute it, one claimed shard at a time.
+    def __init__(self, dest_dir, entries, move=False, shards=DEFAULT_PLAN_SHARDS, path=None):
+        self.dest_dir = str(dest_dir)
+        self.entries = entries
+        self.move = move
+        self.shards = max(1, min(shards, len(entries) or 1))
+        self.path = Path(path) if path else None
+
+    @classmethod
+    def from_groups(cls, groups, folder_names, dest_dir, move=False, shards=DEFAULT_PLAN_SHARDS):
+        entries = {}
+        for files, folder in zip(groups, folder_names):
+            for p in files:
+                # Same name twice in one folder: the later file wins, as with sequential copying
+                entries[(folder, p.name)] = [os.path.abspath(p), folder, p.name] # Valid from any directory
+        return cls(Path(dest_dir).resolve(), list(entries.values()), move, shards)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != PLAN_FORMAT:
+            raise ValueError(f"'{path}' is not a FileCascade copy plan")
+        return cls(data['dest_dir'], data['entries'], data.get('move', False), data.get('shards', 1), path)
+
+    @property
+    def state_dir(self):
+        return self.path.with_name(self.path.name + PLAN_STATE_SUFFIX)
+
+    def shard(self, index):
+        # Contiguous slices keep each shard's files in few folders
+        n = len(self.entries)
+        return self.entries[index * n // self.shards:(index + 1) * n // self.shards]
+
+    def save(self, path):
+        self.path = Path(path)
+        _write_json_atomic(self.path, {'format': PLAN_FORMAT, 'app_version': APP_VERSION,
+                                       'created': datetime.now().isoformat(timespec='seconds'),
+                                       'dest_dir': self.dest_dir, 'move': self.move,
+                                       'shards': self.shards, 'entries': self.entries})
+        # Claims and progress from an earlier plan at this path no longer apply
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+
+def _write_json_atomic(path, data):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _shard_file(state_dir, index, kind):
+    return state_dir / f"shard-{index:05d}.{kind}"
+
+
+def claim_plan_shard(state_dir, index, reclaim_after=0):
+    import socket
+    lock = _shard_file(state_dir, index, 'lock')
+    owner = {'host': socket.gethostname(), 'pid': os.getpid(), 'claimed': time.time()}
+    try:
+        # O_EXCL makes the claim atomic, on local disks and NFSv3+ alike
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        if not reclaim_after:
+            return False
+        try:
+            st = lock.stat()
+        except FileNotFoundError:
+            return False
+        if time.time() - st.st_mtime < reclaim_after:
+            return False
+        # One marker per stale lock generation, so only one reclaimer can win it
+        marker = state_dir / f"shard-{index:05d}.reclaim-{st.st_ino}-{st.st_mtime_ns}"
+        try:
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+        except FileExistsError:
+            return False
+        _write_json_atomic(lock, dict(owner, reclaimed_from=_read_json(lock)))
+        return True
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(owner, f)
+    return True
+
+
+def _run_plan_shard(plan, index, control, report):
+    import socket
+    state = plan.state_dir
+    lock, progress_file = _shard_file(state, index, 'lock'), _shard_file(state, index, 'progress')
+    groups, names, slots = [], [], {}
+    for src, folder, name in plan.shard(index):
+        if folder not in slots:
+            slots[folder] = len(groups)
+            groups.append([]); names.append(folder)
+        groups[slots[folder]].append((Path(src), name))
+    counts = {'done': 0, 'total': sum(len(g) for g in groups), 'errors': 0,
+              'host': socket.gethostname(), 'pid': os.getpid()}
+    last_write = [0.0]
+
+    def on_progress(cur, tot, msg):
+        counts.update(done=cur, total=tot)
+        if msg.startswith("ERROR"):
+            counts['errors'] += 1
+        report(f"[shard {index}] {msg}")
+        now = time.monotonic()
+        if now - last_write[0] >= PLAN_PROGRESS_INTERVAL:
+            last_write[0] = now
+            _write_json_atomic(progress_file, counts)
+
+    def heartbeat():
+        # Keeps the claim fresh through long files and pauses, so --reclaim-after
+        # only ever takes over shards whose process is gone
+        while not stopped.wait(PLAN_HEARTBEAT_SECONDS):
+            try:
+                os.utime(lock)
+            except OSError:
+                pass
+
+    stopped = threading.Event()
+    beat = threading.Thread(target=heartbeat, daemon=True)
+    beat.start()
+    outcome = {}
+    try:
+        worker = FileCopyWorker(groups, plan.dest_dir, names, move=plan.move, control=control,
+                                journal_name=f"{Path(MOVE_JOURNAL_NAME).stem}.shard-{index:05d}.jsonl")
+        worker.progress.connect(on_progress)
+        worker.finished.connect(lambda ok, msg: outcome.update(ok=ok, message=msg))
+        worker.run()
+    finally:
+        stopped.set()
+        beat.join()
+    report(f"[shard {index}] {outcome.get('message', '')}")
+    _write_json_atomic(progress_file, counts)
+    if control.is_cancelled():
+        lock.unlink(missing_ok=True) # Released so any process can resume the shard
+        return False
+    ok = outcome.get('ok', False)
+    record = dict(counts, ok=ok, message=outcome.get('message', ''))
+    if ok:
+        _write_json_atomic(_shard_file(state, index, 'done'), record)
+        _shard_file(state, index, 'failed').unlink(missing_ok=True)
+    else:
+        # Not marked done: the claim is released so the next run retries the shard
+        _write_json_atomic(_shard_file(state, index, 'failed'), record)
+        lock.unlink(missing_ok=True)
+    return ok
+
+
+def run_plan(plan_path, control=None, report=print, reclaim_after=0):
+    plan = CopyPlan.load(plan_path)
+    plan.state_dir.mkdir(exist_ok=True)
+    control = control or WorkerControl()
+    ok, ran = True, 0
+    for index in range(plan.shards):
+        if control.is_cancelled():
+            break
+        done_file = _shard_file(plan.state_dir, index, 'done')
+        if done_file.exists() or not claim_plan_shard(plan.state_dir, index, reclaim_after):
+            continue
+        if done_file.exists():
+            continue # Finished by another process between the check and the claim
+        ran += 1
+        report(f"Claimed shard {index + 1}/{plan.shards}.")
+        ok = _run_plan_shard(plan, index, control, report) and ok
+    report(f"This process ran {ran} of {plan.shards} shards.")
+    return ok and not control.is_cancelled()
+
+
+def plan_status(plan):
+    # Sums the per-shard files; works from any host that sees the state directory
+    status = {'done': 0, 'errors': 0, 'total': len(plan.entries), 'shards': plan.shards,
+              'shards_done': 0, 'shards_failed': 0, 'shards_running': 0}
+    try:
+        names = set(os.listdir(plan.state_dir))
+    except FileNotFoundError:
+        return status
+    for index in range(plan.shards):
+        done_file = _shard_file(plan.state_dir, index, 'done')
+        if done_file.name in names:
+            rec = _read_json(done_file) or {}
+            status['shards_done'] += 1
+        else:
+            rec = _read_json(_shard_file(plan.state_dir, index, 'progress')) or {}
+            if _shard_file(plan.state_dir, index, 'lock').name in names:
+                status['shards_running'] += 1
+            elif _shard_file(plan.state_dir, index, 'failed').name in names:
+                status['shards_failed'] += 1 # Retried by the next run
+        status['done'] += rec.get('done', 0)
+        status['errors'] += rec.get('errors', 0)
+    return status
+
+
+def self_command(*args):
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, *args] # A frozen build is its own interpreter
+    return [sys.executable, os.path.abspath(__file__), *args]
+
+
+def launch_plan_processes(plan, count, max_mbps=0, max_stat_ops=0):
+    import subprocess
+    plan.state_dir.mkdir(exist_ok=True)
+    processes = []
+    for i in range(count):
+        with open(plan.state_dir / f"worker-{i + 1}.log", 'w', encoding='utf-8') as log:
+            processes.append(subprocess.Popen(
+                self_command("--run-plan", str(plan.path),
+                             "--max-mbps", str(_split_limit(max_mbps, count)),
+                             "--max-stat-ops", str(_split_limit(max_stat_ops, count))),
+                stdin=subprocess.PIPE, stdout=log, stderr=subprocess.STDOUT, text=True))
+    return processes
+
+
+def _split_limit(limit, count):
+    # Shares a limit evenly; rounds up so a small limit never becomes 0 (unlimited)
+    return -(-limit // count) if limit else 0
+
+
+class PlanProcessControl:
+    # Drives plan worker processes through the same stdin commands an operator would type
+    def __init__(self, processes):
+        self.processes = processes
+        self._paused = False
+
+    def _send(self, command):
+        for proc in self.processes:
+            if proc.poll() is None:
+                try:
+                    proc.stdin.write(command + "\n")
+                    proc.stdin.flush()
+                except OSError:
+                    pass # Exited in the meantime
+
+    def pause(self):
+        self._paused = True
+        self._send("pause")
+
+    def resume(self):
+        self._paused = False
+        self._send("resume")
+
+    def cancel(self):
+        self._send("cancel")
+
+    def is_paused(self):
+        return self._paused
+
+    def set_limits(self, max_bytes_per_sec=None, max_stat_ops_per_sec=None):
+        n = len(self.processes)
+        if max_bytes_per_sec is not None:
+            self._send(f"mbps {_split_limit(max_bytes_per_sec // (1024 * 1024), n)}")
+        if max_stat_ops_per_sec is not None:
+            self._send(f"stats {_split_limit(max_stat_ops_per_sec, n)}")
+
+
+# --- Grouping ---
+def iter_time_groups(files, minutes):
+    # files must be sorted by 'mod_time_ts'; yields each group once the gap closes it
+    gap = timedelta(minutes=minutes).total_seconds()
+    cur = []; last = None
+    for fi in files:
+        if cur and fi['mod_time_ts'] - last > gap:
+            yield cur
+            cur = []
+        cur.append(fi); last = fi['mod_time_ts']
+    if cur:
+        yield cur
+
+
+def iter_time_group_chunks(files, minutes, max_files):
+    # As iter_time_groups, but yields (group number, files) with groups larger
+    # than max_files cut into pieces that share the group's number.
+    gap = timedelta(minutes=minutes).total_seconds()
+    cur = []; last = None; num = 0
+    for fi in files:
+        if last is None or fi['mod_time_ts'] - last > gap:
+            if cur:
+                yield num, cur
+                cur = []
+            num += 1
+        elif len(cur) >= max_files:
+            yield num, cur
+            cur = []
+        cur.append(fi); last = fi['mod_time_ts']
+    if cur:
+        yield num, cur
+
+
+def folder_name_for(pattern, num, key=None):
+    if "{num}" not in pattern and "{key}" not in pattern:
+        pattern = DEFAULT_FOLDER_NAME_PATTERN
+    # Groups without a grouping key (time, manual or added by hand) use their number for {key}
+    return pattern.replace("{num}", str(num)).replace("{key}", str(num) if key is None else key)
+
+
+def parse_size(text):
+    m = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*', text, re.IGNORECASE)
+    if not m:
+        raise ValueError(f"Invalid size '{text}' (e.g. 512KB, 10MB)")
+    return int(float(m.group(1)) * 1024 ** " kmgt".index(m.group(2).lower() or " "))
+
+
+class GroupingKey(ABC):
+    # Maps a scanned file record to a bucket; files with equal keys share a
+    # group. Add subclasses to GROUPING_KEYS to offer them in the UI and CLI;
+    # one without key() fails when it is created, not partway through grouping.
+    name = ""
+    label = ""
+    option_hint = "" # Placeholder for the option field; empty when the key takes no option
+
+    def __init__(self, option=""):
+        self.option = option.strip()
+
+    @abstractmethod
+    def key(self, fi):
+        ... # Returns the bucket for one file record; must be hashable
+
+    def label_for(self, key):
+        return str(key)
+
+    def bucket_order(self, keys):
+        return list(keys) # Order of each bucket's first file
+
+
+class ParentDirectoryKey(GroupingKey):
+    name, label = "parent", "Parent folder"
+    root = None # Deepest folder shared by all buckets, set by bucket_order
+
+    def key(self, fi):
+        return os.fspath(fi['path']).rpartition(os.sep)[0] # Far cheaper than Path.parent on millions of files
+
+    def label_for(self, key):
+        # Relative to the shared root so /x/run1 and /y/run1 stay apart as x_run1 and y_run1
+        rel = os.path.relpath(key, self.root) if self.root else os.curdir
+        if rel == os.curdir:
+            return os.path.basename(key) or key
+        return rel.replace(os.sep, "_")
+
+    def bucket_order(self, keys):
+        keys = list(keys)
+        try:
+            self.root = os.path.commonpath(keys) if len(keys) > 1 else None
+        except ValueError: # Different drives on Windows
+            self.root = None
+        return keys
+
+
+class FilenameRegexKey(GroupingKey):
+    name, label = "regex", "Filename regex"
+    option_hint = r"Regex, e.g. run_(\d+)"
+
+    def __init__(self, option=""):
+        super().__init__(option)
+        if not self.option:
+            raise ValueError("Filename regex grouping needs a regex.")
+        try:
+            self.regex = re.compile(self.option)
+        except re.error as e:
+            raise ValueError(f"Invalid filename regex: {e}")
+
+    def key(self, fi):
+        m = self.regex.search(fi['path'].name)
+        if m is None:
+            return None
+        return m.group(1) if m.groups() else m.group(0)
+
+    def label_for(self, key):
+        return "unmatched" if key is None else key
+
+    def bucket_order(self, keys):
+        return sorted(keys, key=lambda k: k is None) # Unmatched files last
+
+
+class SizeBucketKey(GroupingKey):
+    name, label = "size", "Size bucket"
+    option_hint = "Bucket width, e.g. 10MB (empty = powers of two)"
+
+    def __init__(self, option=""):
+        super().__init__(option)
+        self.width = parse_size(self.option) if self.option else 0
+        if self.option and self.width <= 0:
+            raise ValueError("Size bucket width must be positive.")
+
+    def key(self, fi):
+        if self.width:
+            return fi['size'] // self.width
+        return fi['size'].bit_length() # Bucket n holds sizes in [2**(n-1), 2**n)
+
+    def label_for(self, key):
+        if self.width:
+            low, high = key * self.width, (key + 1) * self.width
+        else:
+            low, high = (1 << key - 1) if key else 0, 1 << key
+        return f"{format_size(low)} - {format_size(high)}"
+
+    def bucket_order(self, keys):
+        return sorted(keys)
+
+
+GROUPING_KEYS = {cls.name: cls for cls in (ParentDirectoryKey, FilenameRegexKey, SizeBucketKey)}
+
+
+def group_files_by_key(files, grouping_key, minutes=None):
+    # One hash-bucket pass, linear in the number of files. With `minutes`, the
+    # time-gap rule then splits each bucket (files must be sorted by time).
+    # Returns (label, files) pairs. Labels are unique so {key} alone names
+    # distinct folders: a split bucket numbers its parts and clashes get a suffix.
+    buckets = {}
+    key = grouping_key.key
+    for fi in files:
+        k = key(fi)
+        bucket = buckets.get(k)
+        if bucket is None:
+            buckets[k] = bucket = []
+        bucket.append(fi)
+    groups, used = [], set()
+    for k in grouping_key.bucket_order(buckets):
+        label = grouping_key.label_for(k)
+        parts = [buckets[k]] if minutes is None else list(iter_time_groups(buckets[k], minutes))
+        for n, g in enumerate(parts, 1):
+            base = f"{label}_{n}" if len(parts) > 1 else label
+            unique, i = base, 2
+            while unique.casefold() in used: # Case-insensitive filesystems would merge these too
+                unique = f"{base}_{i}"; i += 1
+            used.add(unique.casefold())
+            groups.append((unique, g))
+    return groups
+
+
+# --- Watch Mode ---
+class InotifyWatcher:
+    # Recursive inotify(7) watch through libc. Raises OSError where inotify is
+    # unavailable so the caller can fall back to polling.
+    IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x8, 0x80, 0x100
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, root, skip=None):
+        import ctypes
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._add_watch.restype = ctypes.c_int
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.skip = skip
+        self.overflowed = False
+        self.failed_dirs = 0
+        self._dirs = {} # Watch descriptor -> directory; entries drop out as directories go away
+        self._watch_tree(os.fspath(root), collect=False)
+        if not self._dirs:
+            os.close(self.fd)
+            raise OSError(f"cannot watch '{root}'")
+
+    def _watch_tree(self, root, collect=True):
+        # Returns files already inside a new directory, written before its watch existed
+        found, stack = [], [root]
+        while stack:
+            current = stack.pop()
+            if current == self.skip:
+                continue
+            wd = self._add_watch(self.fd, os.fsencode(current), self.MASK)
+            if wd < 0:
+                self.failed_dirs += 1 # Usually fs.inotify.max_user_watches
+                continue
+            self._dirs[wd] = current
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif collect:
+                            found.append(entry.path)
+            except OSError:
+                continue
+        return found
+
+    def read(self, timeout):
+        import select, struct
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths, pos = [], 0
+        while pos + 16 <= len(data):
+            wd, mask, _cookie, length = struct.unpack_from('iIII', data, pos)
+            name = data[pos + 16:pos + 16 + length].rstrip(b'\0')
+            pos += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    paths.extend(self._watch_tree(path))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                paths.append(path)
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class WatchDaemon:
+    # Groups files as they arrive. Each settled file joins the open group in
+    # O(1) unless the time gap starts a new one, and a group that has had no
+    # arrivals for the threshold is closed and copied. Only in-flight files,
+    # the open group and a short dedupe window are held, so memory stays flat.
+    def __init__(self, source, dest, extensions, threshold_minutes=DEFAULT_TIME_THRESHOLD_MINUTES,
+                 pattern=DEFAULT_FOLDER_NAME_PATTERN, timestamp_source=DEFAULT_TIMESTAMP_SOURCE,
+                 content_column="", content_regex="", move=False, archive_format="folder",
+                 control=None, report=print, settle_seconds=WATCH_SETTLE_SECONDS, use_inotify=True):
+        self.source = os.path.abspath(source)
+        self.dest = Path(dest)
+        self.dest.mkdir(parents=True, exist_ok=True)
+        self.extensions = {ext.strip().lower() for ext in extensions if ext.strip()}
+        self.gap = threshold_minutes * 60
+        self.pattern = pattern
+        self.timestamp_source = timestamp_source
+        self.content_column, self.content_regex = content_column.strip(), content_regex.strip()
+        self.move, self.archive_format = move, archive_format
+        self.control = control or WorkerControl()
+        self.report = report
+        self.settle = settle_seconds
+        self.use_inotify = use_inotify
+        dest_abs = os.path.abspath(dest)
+        # Copies landing inside the watched tree must not be picked up again
+        self.skip = dest_abs if os.path.commonpath([self.source, dest_abs]) == self.source else None
+        self.state_path = self.dest / WATCH_STATE_NAME
+        state = _read_json(self.state_path) or {}
+        self.next_group = state.get('next_group', 1)
+        self.mark_ns = state.get('mark_ns', time.time_ns()) # Newest change time grouped so far
+        self.recent = state.get('recent', {}) # Path -> change time of files grouped near the mark
+        self.pending = {} # Path -> (size, mtime_ns, ctime_ns, stable since)
+        self.group, self.group_last_ts, self.group_min_ctime = [], None, None
+        self.last_arrival = time.monotonic()
+        self.retry_at = None # Set while the open group's last copy attempt failed
+
+    def _timestamp(self, path, st):
+        if self.timestamp_source == "content":
+            try:
+                ts = extract_content_timestamp(path, self.content_column, self.content_regex or None)
+            except (OSError, ValueError):
+                ts = None
+            return ts if ts is not None else st.st_mtime
+        return stat_timestamp(path, st, self.timestamp_source)
+
+    def _floor_ns(self):
+        # Oldest change time not yet safely copied; a restart rescans from here
+        floor = self.mark_ns
+        if self.group_min_ctime is not None:
+            floor = min(floor, self.group_min_ctime)
+        for _size, _mtime, ctime_ns, _since in self.pending.values():
+            floor = min(floor, ctime_ns)
+        return floor
+
+    def _prune(self):
+        keep = self._floor_ns() - int(WATCH_MARK_SLACK_SECONDS * 1e9)
+        self.recent = {p: c for p, c in self.recent.items() if c >= keep}
+
+    def _save_state(self):
+        self._prune()
+        # The open group is not copied yet, so a restart must pick its files up again
+        open_paths = {os.fspath(p) for p in self.group}
+        recent = {p: c for p, c in self.recent.items() if p not in open_paths}
+        _write_json_atomic(self.state_path, {'next_group': self.next_group, 'mark_ns': self._floor_ns(),
+                                             'recent': recent})
+
+    def offer(self, path, st=None):
+        if os.path.splitext(path)[1].lower() not in self.extensions or path in self.pending:
+            return
+        if self.skip and path.startswith(self.skip + os.sep):
+            return
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return
+        if self.recent.get(path) == st.st_ctime_ns:
+            return # Already grouped
+        self.pending[path] = (st.st_size, st.st_mtime_ns, st.st_ctime_ns, time.monotonic())
+
+    def _poll_pass(self):
+        # Change time rather than mtime, so files copied in with preserved times are still seen
+        since = self.mark_ns - int(WATCH_MARK_SLACK_SECONDS * 1e9)
+        # The destination subtree is pruned from the walk, so each pass costs the same however much was copied
+        for path, st in iter_matching_files(self.source, self.extensions, self.control, self.skip):
+            if st.st_ctime_ns >= since:
+                self.offer(path, st)
+
+    def _settle(self):
+        now, ready = time.monotonic(), []
+        for path, (size, mtime_ns, ctime_ns, since) in list(self.pending.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self.pending[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                self.pending[path] = (st.st_size, st.st_mtime_ns, st.st_ctime_ns, now) # Still being written
+            elif now - since >= self.settle:
+                del self.pending[path]
+                ready.append((self._timestamp(path, st), path, st))
+        for ts, path, st in sorted(ready, key=lambda r: (r[0], r[1])):
+            if not self._add(ts, path, st):
+                # Starts a new group but the open one could not be copied yet; hold it back
+                self.pending[path] = (st.st_size, st.st_mtime_ns, st.st_ctime_ns, now - self.settle)
+
+    def _add(self, ts, path, st):
+        if self.group and ts - self.group_last_ts > self.gap and not self.close_group():
+            return False
+        self.recent[path] = st.st_ctime_ns
+        self.mark_ns = max(self.mark_ns, st.st_ctime_ns)
+        self.group.append(Path(path))
+        self.group_last_ts = ts if self.group_last_ts is None else max(self.group_last_ts, ts)
+        self.group_min_ctime = st.st_ctime_ns if self.group_min_ctime is None else min(self.group_min_ctime, st.st_ctime_ns)
+        self.last_arrival = time.monotonic()
+        return True
+
+    def close_group(self):
+        if self.retry_at is not None:
+            if time.monotonic() < self.retry_at:
+                return False
+            # Sources that vanished since the failed attempt would fail every retry
+            # (moved ones are already in place), so only the rest are retried
+            kept = [p for p in self.group if p.exists()]
+            if len(kept) < len(self.group):
+                self.report(f"{len(self.group) - len(kept)} files left the source since the last attempt.")
+                self.group = kept
+                if not kept:
+                    self.retry_at = None
+                    self.group, self.group_last_ts, self.group_min_ctime = [], None, None
+                    self._save_state()
+                    return True
+        name = folder_name_for(self.pattern, self.next_group)
+        self.report(f"Closing group '{name}' with {len(self.group)} files.")
+        outcome = {}
+        worker = FileCopyWorker([self.group], self.dest, [name], move=self.move,
+                                archive_format=self.archive_format, control=self.control)
+        worker.progress.connect(lambda _cur, _tot, msg: self.report(msg))
+        worker.finished.connect(lambda ok, msg: outcome.update(ok=ok, message=msg))
+        worker.run()
+        self.report(outcome.get('message', ""))
+        if self.control.is_cancelled():
+            return False # Kept open; the saved state rescans it on the next start
+        if not outcome.get('ok', False):
+            # Kept open under the same number; files already in place are skipped on retry
+            self.retry_at = time.monotonic() + WATCH_RETRY_SECONDS
+            self.report(f"Group '{name}' kept open; retrying in {WATCH_RETRY_SECONDS:g}s.")
+            return False
+        self.retry_at = None
+        self.next_group += 1
+        self.group, self.group_last_ts, self.group_min_ctime = [], None, None
+        self._save_state()
+        return True
+
+    def run(self):
+        watcher = None
+        if self.use_inotify:
+            try:
+                watcher = InotifyWatcher(self.source, self.skip)
+                if watcher.failed_dirs:
+                    self.report(f"Could not watch {watcher.failed_dirs} directories; raise fs.inotify.max_user_watches.")
+            except OSError as e:
+                self.report(f"inotify unavailable ({e}); falling back to polling.")
+        mode = "inotify" if watcher else f"polling every {WATCH_POLL_SECONDS:g}s"
+        self.report(f"Watching '{self.source}' ({mode}). Groups close after {self.gap / 60:g} idle minutes.")
+        try:
+            self._poll_pass() # Catch up on files that arrived while stopped
+            next_poll = time.monotonic() + WATCH_POLL_SECONDS
+            while True:
+                self.control.checkpoint()
+                if watcher:
+                    for path in watcher.read(WATCH_TICK_SECONDS):
+                        self.offer(path)
+                    if watcher.overflowed:
+                        watcher.overflowed = False
+                        self.report("inotify queue overflowed; rescanning.")
+                        self._poll_pass()
+                else:
+                    time.sleep(WATCH_TICK_SECONDS)
+                if time.monotonic() >= next_poll:
+                    if not watcher:
+                        self._poll_pass()
+                    self._prune()
+                    next_poll = time.monotonic() + WATCH_POLL_SECONDS
+                self._settle()
+                if self.group and time.monotonic() - self.last_arrival > self.gap:
+                    self.close_group()
+        except OperationCancelled:
+            pass
+        finally:
+            if watcher:
+                watcher.close()
+            self._save_state()
+        self.report("Watch stopped. Files not yet copied are picked up on the next start.")
+
+
+# --- File Preview ---
+def format_size(num_bytes):
+    size = float(num_bytes)
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{int(size)} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def load_file_preview(path, max_lines=PREVIEW_LINES, read_bytes=PREVIEW_READ_BYTES):
+    # One stat and one partial read, so a preview costs the same on a
+    # network share whatever the size of the file.
+    preview = {'path': str(path)}
+    try:
+        st = os.stat(path)
+        with open(path, 'rb') as f:
+            head = f.read(read_bytes)
+    except OSError as e:
+        preview['error'] = str(e)
+        return preview
+    birth = getattr(st, 'st_birthtime', None)
+    if birth is None and sys.platform.startswith('linux'):
+        birth = _statx_birthtime(path)
+    preview.update(size=st.st_size, mtime=st.st_mtime, ctime=st.st_ctime, birthtime=birth)
+    if b'\0' in head:
+        preview['text'] = None # Binary
+        return preview
+    lines = head.decode('utf-8-sig', errors='replace').splitlines()
+    if len(head) < st.st_size and len(lines) > 1:
+        lines.pop() # Cut off mid-line by the partial read
+    preview['text'] = "\n".join(lines[:max_lines])
+    preview['truncated'] = len(head) < st.st_size or len(lines) > max_lines
+    return preview
+
+
+class PreviewCache:
+    # LRU bounded by the approximate bytes of the previews it holds
+    def __init__(self, max_bytes=PREVIEW_CACHE_BYTES):
+        from collections import OrderedDict
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def _cost(preview):
+        return 256 + len(preview.get('text') or "")
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        preview = self._entries.get(key)
+        if preview is not None:
+            self._entries.move_to_end(key)
+        return preview
+
+    def put(self, key, preview):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= self._cost(old)
+        self._entries[key] = preview
+        self._bytes += self._cost(preview)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._cost(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+
+class FilePreviewWorker(QThread):
+    ready = Signal(str, object)
+
+    def __init__(self):
+        super().__init__()
+        self._pending = []
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def request(self, paths):
+        # The first path is the one on screen, the rest are prefetches.
+        # A new request replaces whatever is still queued from the last one.
+        with self._cond:
+            self._pending = list(paths)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                path = self._pending.pop(0)
+            self.ready.emit(path, load_file_preview(path))
+
+
 # --- DraggableListWidget --- 
 class DraggableListWidget(QListWidget):
     item_dropped = Signal()
@@ -256,11 +2134,12 @@ class DraggableListWidget(QListWidget):
         if not items:
             return
         mime = QMimeData()
-        paths = [it.data(Qt.UserRole) for it in items if isinstance(it.data(Qt.UserRole), Path)]
-        if not paths:
+        # Item text travels with the path so the drop keeps the scan's timestamp
+        entries = [(it.data(Qt.UserRole), it.text()) for it in items if isinstance(it.data(Qt.UserRole), Path)]
+        if not entries:
             return
         try:
-            data = pickle.dumps(paths)
+            data = pickle.dumps(entries)
             mime.setData(CUSTOM_MIME_TYPE, QByteArray(data))
         except Exception as e:
             print(f"Drag serialize error: {e}")
@@ -291,27 +2170,21 @@ class DraggableListWidget(QListWidget):
             return
         data = event.mimeData().data(CUSTOM_MIME_TYPE)
         try:
-            paths = pickle.loads(bytes(data))
+            entries = pickle.loads(bytes(data))
         except Exception as e:
             print(f"Drop deserialize error: {e}")
             event.ignore()
             return
-        if not isinstance(paths, list):
+        if not isinstance(entries, list):
             event.ignore()
             return
         pt = event.position().toPoint()
         target_item = self.itemAt(pt)
         row = self.row(target_item) if target_item else self.count()
         added = []
-        for p in paths:
-            if isinstance(p, Path):
-                text = p.name
-                try:
-                    ts = os.path.getmtime(p)
-                    ts_str = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
-                    text = f"{p.name} ({ts_str})"
-                except:
-                    text = f"{p.name} (time unavailable)"
+        for entry in entries:
+            if isinstance(entry, tuple) and len(entry) == 2 and isinstance(entry[0], Path):
+                p, text = entry
                 itm = QListWidgetItem(text)
                 itm.setData(Qt.UserRole, p)
                 itm.setToolTip(str(p))
@@ -334,6 +2207,7 @@ class DraggableListWidget(QListWidget):
 
 # --- Main Application ---
 class FileCascadeApp(QWidget):
+    startup_finished = Signal(float) # Time to first window, in ms
     EDITABLE_TITLE_STYLE_READONLY = """
         QLineEdit {
             background-color: transparent;
@@ -350,13 +2224,20 @@ class FileCascadeApp(QWidget):
 
     def __init__(self):
         super().__init__()
-        self.setWindowIcon(create_app_icon())
-        self.setWindowTitle("File Cascade v1.3.0")
+        self.setWindowIcon(cached_icon("app", create_app_icon, 256))
+        self.setWindowTitle(f"File Cascade v{APP_VERSION}")
         self.setMinimumSize(800, 600)
+        self.time_to_first_window_ms = None
 
         self.source_dir = ""
         self.dest_dir = ""
         self.original_scanned_files = []
+        self.scanned_by_path = {}
+        self.search_index = None
+        self.search_matches = [] # Paths matching the current query
+        self.search_cursor = -1
+        self._search_items = None # path -> (group index, QListWidgetItem), rebuilt after edits
+        self._highlighted_items = []
         self.groups_widgets = []
         self.group_ui_elements = []
 
@@ -367,10 +2248,20 @@ class FileCascadeApp(QWidget):
         self.folder_name_pattern = DEFAULT_FOLDER_NAME_PATTERN
         self.group_title_editing_enabled = False
         self.file_extensions = DEFAULT_EXTENSIONS # New state variable
+        self.timestamp_source = DEFAULT_TIMESTAMP_SOURCE
+        self.timestamp_cache = TimestampCache()
+        self.move_mode_enabled = False
+        self.archive_format = "folder"
+        self.worker_control = None
+        self.plan = None
+        self.plan_processes = []
+        self.preview_cache = PreviewCache()
+        self.preview_worker = None # Started on first use
+        self._preview_path = None
 
         # Icons
-        self.add_icon = create_icon('+')
-        self.remove_icon = create_icon('x', color="red")
+        self.add_icon = cached_icon("add", lambda: create_icon('+'), 16)
+        self.remove_icon = cached_icon("remove", lambda: create_icon('x', color="red"), 16)
 
         # Layouts
         self.main_layout = QVBoxLayout(self)
@@ -378,6 +2269,7 @@ class FileCascadeApp(QWidget):
         self.settings_layout_top_row = QHBoxLayout() # Renamed for clarity
         self.settings_layout_mid_row = QHBoxLayout() # Renamed for clarity
         self.settings_layout_bottom_row = QHBoxLayout() # New row for extensions
+        self.settings_layout_output_row = QHBoxLayout()
         self.groups_area_layout = QVBoxLayout()
         self.bottom_layout = QVBoxLayout()
 
@@ -402,15 +2294,29 @@ class FileCascadeApp(QWidget):
         self.manual_group_count_spinbox.valueChanged.connect(self._on_manual_count_changed)
         self.regroup_button = QPushButton("Apply Grouping Settings")
         self.regroup_button.clicked.connect(self.regroup_files); self.regroup_button.setEnabled(False)
+        self.group_key_label = QLabel("Group By:")
+        self.group_key_combo = QComboBox(); self.group_key_combo.addItem("Time gap", None)
+        for name, cls in GROUPING_KEYS.items():
+            self.group_key_combo.addItem(cls.label, name)
+        self.group_key_combo.setToolTip("Put files with the same key in the same group")
+        self.group_key_combo.currentIndexChanged.connect(self._on_group_key_changed)
+        self.group_key_option_input = QLineEdit(); self.group_key_option_input.setEnabled(False)
+        self.group_key_time_checkbox = QCheckBox("Split by Time Gap")
+        self.group_key_time_checkbox.setToolTip("Also split each key's files wherever the time threshold is exceeded")
+        self.group_key_time_checkbox.setEnabled(False)
 
         # Naming/Editing Settings Row 2 (settings_layout_mid_row)
         self.folder_pattern_label = QLabel("Default Folder Pattern:")
         self.folder_pattern_input = QLineEdit(); self.folder_pattern_input.setText(self.folder_name_pattern)
-        self.folder_pattern_input.setToolTip("Pattern for destination folders (use {num})")
+        self.folder_pattern_input.setToolTip("Pattern for destination folders (use {num}, and {key} for the Group By key)")
         self.folder_pattern_input.textChanged.connect(self._on_folder_pattern_changed)
         self.title_edit_checkbox = QCheckBox("Enable Group Title Editing")
         self.title_edit_checkbox.setToolTip("Toggle manual group title editing.")
         self.title_edit_checkbox.stateChanged.connect(self._on_title_edit_toggle)
+        self.move_mode_checkbox = QCheckBox("Move Instead of Copy")
+        self.move_mode_checkbox.setToolTip("Move files to the destination, removing the originals.\n"
+                                           "Same-volume moves are instant renames; cross-volume moves are journaled.")
+        self.move_mode_checkbox.stateChanged.connect(self._on_move_mode_toggle)
 
         # Extension Settings Row 3 (settings_layout_bottom_row) - New
         self.extensions_label = QLabel("File Extensions:")
@@ -418,6 +2324,58 @@ class FileCascadeApp(QWidget):
         self.extensions_input.setText(self.file_extensions)
         self.extensions_input.setToolTip("Comma-separated list of extensions (e.g., .csv, .txt, .log)")
         self.extensions_input.textChanged.connect(self._on_extensions_changed)
+        self.timestamp_source_label = QLabel("Timestamp:")
+        self.timestamp_source_combo = QComboBox()
+        for key, label in TIMESTAMP_SOURCES.items():
+            self.timestamp_source_combo.addItem(label, key)
+        self.timestamp_source_combo.currentIndexChanged.connect(self._on_timestamp_source_changed)
+        self.content_column_input = QLineEdit(); self.content_column_input.setPlaceholderText("Column (index or name)")
+        self.content_column_input.setToolTip("CSV column holding the timestamp, as a 0-based index or header name")
+        self.content_regex_input = QLineEdit(); self.content_regex_input.setPlaceholderText("Regex (optional)")
+        self.content_regex_input.setToolTip("Regex matched against the file head; group 1 (or the whole match) is parsed")
+        self.content_column_input.setEnabled(False); self.content_regex_input.setEnabled(False)
+
+        # Output Settings Row 4 (settings_layout_output_row)
+        self.output_format_label = QLabel("Output:")
+        self.output_format_combo = QComboBox()
+        for fmt in available_archive_formats():
+            self.output_format_combo.addItem(ARCHIVE_FORMATS[fmt], fmt)
+        self.output_format_combo.setToolTip("Copy into group folders, or stream each group into one archive named by the folder pattern")
+        self.output_format_combo.currentIndexChanged.connect(self._on_output_format_changed)
+        self.archive_level_label = QLabel("Level:")
+        self.archive_level_spinbox = QSpinBox(); self.archive_level_spinbox.setRange(0,19)
+        self.archive_level_spinbox.setValue(DEFAULT_ARCHIVE_LEVEL)
+        self.archive_level_spinbox.setToolTip("Compression level (gzip/zip use 0-9, zstd 1-19)")
+        self.archive_workers_label = QLabel("Workers:")
+        self.archive_workers_spinbox = QSpinBox(); self.archive_workers_spinbox.setRange(1,64)
+        self.archive_workers_spinbox.setValue(DEFAULT_ARCHIVE_WORKERS)
+        self.archive_workers_spinbox.setToolTip("Groups compressed in parallel, one process each")
+        self.archive_memory_label = QLabel("Memory/Worker (MB):")
+        self.archive_memory_spinbox = QSpinBox(); self.archive_memory_spinbox.setRange(8,4096)
+        self.archive_memory_spinbox.setValue(DEFAULT_ARCHIVE_MEMORY_MB)
+        self.archive_memory_spinbox.setToolTip("Bounds the compression window of each worker")
+        self._set_archive_controls_enabled(False)
+        self.plan_processes_label = QLabel("Processes:")
+        self.plan_processes_spinbox = QSpinBox(); self.plan_processes_spinbox.setRange(1,64)
+        self.plan_processes_spinbox.setToolTip("Above 1, the copy runs as a plan shared between this many worker processes")
+
+        # Search Row
+        self.search_layout = QHBoxLayout()
+        self.search_input = QLineEdit(); self.search_input.setPlaceholderText("Search files in all groups (^prefix for name prefix)")
+        self.search_input.setEnabled(False)
+        self.search_timer = QTimer(self); self.search_timer.setSingleShot(True); self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(self.schedule_search)
+        self.search_input.returnPressed.connect(self.next_match)
+        self.search_status_label = QLabel("")
+        self.search_prev_button = QPushButton("Prev"); self.search_prev_button.clicked.connect(self.prev_match)
+        self.search_next_button = QPushButton("Next"); self.search_next_button.clicked.connect(self.next_match)
+        self.search_select_button = QPushButton("Select All Matches"); self.search_select_button.clicked.connect(self.select_all_matches)
+        self.search_target_spinbox = QSpinBox(); self.search_target_spinbox.setRange(1,1)
+        self.search_target_spinbox.setPrefix("Group ")
+        self.search_move_button = QPushButton("Move Matches"); self.search_move_button.clicked.connect(self.move_matches_to_group)
+        self.search_move_button.setToolTip("Move every match into the chosen group")
+        self._set_search_actions_enabled(False)
 
         # Groups Scroll Area
         self.groups_scroll_area = QScrollArea(); self.groups_scroll_area.setWidgetResizable(True)
@@ -427,10 +2385,38 @@ class FileCascadeApp(QWidget):
         self.placeholder_label = QLabel("1. Select Source Directory to scan for files.")
         self.groups_area_layout.addWidget(self.placeholder_label, 0, Qt.AlignTop)
 
+        # Preview Pane
+        self.preview_info_label = QLabel("Select a file to preview it.")
+        self.preview_info_label.setWordWrap(True); self.preview_info_label.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.preview_info_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.preview_text = QPlainTextEdit(); self.preview_text.setReadOnly(True)
+        self.preview_text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.preview_text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.preview_layout = QVBoxLayout(); self.preview_layout.setContentsMargins(0,0,0,0)
+        self.groups_splitter = QSplitter(Qt.Horizontal)
+
         # Copy & Log
         self.copy_button = QPushButton("Copy Files to Destination"); self.copy_button.clicked.connect(self.start_copy)
         self.copy_button.setEnabled(False)
+        self.export_plan_button = QPushButton("Export Plan..."); self.export_plan_button.clicked.connect(self.export_plan)
+        self.export_plan_button.setToolTip("Save the copy as a plan that other processes or hosts can run with --run-plan")
+        self.export_plan_button.setEnabled(False)
+        self.copy_row_layout = QHBoxLayout()
+        self.plan_timer = QTimer(self); self.plan_timer.setInterval(PLAN_POLL_MS)
+        self.plan_timer.timeout.connect(self._poll_plan_progress)
         self.progress_bar = QProgressBar(); self.progress_bar.setVisible(False)
+        self.pause_button = QPushButton("Pause"); self.pause_button.clicked.connect(self._on_pause_clicked)
+        self.cancel_button = QPushButton("Cancel"); self.cancel_button.clicked.connect(self._on_cancel_clicked)
+        self.pause_button.setEnabled(False); self.cancel_button.setEnabled(False)
+        self.max_mbps_label = QLabel("Max MB/s:")
+        self.max_mbps_spinbox = QSpinBox(); self.max_mbps_spinbox.setRange(0,100000); self.max_mbps_spinbox.setSpecialValueText("Unlimited")
+        self.max_mbps_spinbox.setToolTip("Copy bandwidth limit; takes effect immediately, 0 = unlimited")
+        self.max_mbps_spinbox.valueChanged.connect(self._on_limits_changed)
+        self.max_stat_ops_label = QLabel("Max stat/s:")
+        self.max_stat_ops_spinbox = QSpinBox(); self.max_stat_ops_spinbox.setRange(0,1000000); self.max_stat_ops_spinbox.setSpecialValueText("Unlimited")
+        self.max_stat_ops_spinbox.setToolTip("File metadata operations per second; takes effect immediately, 0 = unlimited")
+        self.max_stat_ops_spinbox.valueChanged.connect(self._on_limits_changed)
+        self.control_layout = QHBoxLayout()
         self.log_label = QLabel("Process Log:")
         self.log_area = QTextEdit(); self.log_area.setObjectName("log_area")
         self.log_area.setReadOnly(True); self.log_area.setMinimumHeight(100)
@@ -448,35 +2434,72 @@ class FileCascadeApp(QWidget):
         self.settings_layout_top_row.addWidget(self.threshold_label); self.settings_layout_top_row.addWidget(self.threshold_spinbox)
         self.settings_layout_top_row.addSpacing(15);
         self.settings_layout_top_row.addWidget(self.manual_group_checkbox)
-        self.settings_layout_top_row.addWidget(self.manual_group_count_spinbox); self.settings_layout_top_row.addStretch(1)
+        self.settings_layout_top_row.addWidget(self.manual_group_count_spinbox)
+        self.settings_layout_top_row.addSpacing(15)
+        self.settings_layout_top_row.addWidget(self.group_key_label); self.settings_layout_top_row.addWidget(self.group_key_combo)
+        self.settings_layout_top_row.addWidget(self.group_key_option_input); self.settings_layout_top_row.addWidget(self.group_key_time_checkbox)
+        self.settings_layout_top_row.addStretch(1)
         self.settings_layout_top_row.addWidget(self.regroup_button)
 
         settings_frame_mid = QFrame(); settings_frame_mid.setLayout(self.settings_layout_mid_row)
         self.settings_layout_mid_row.addWidget(self.folder_pattern_label); self.settings_layout_mid_row.addWidget(self.folder_pattern_input,1)
         self.settings_layout_mid_row.addSpacing(15);
         self.settings_layout_mid_row.addWidget(self.title_edit_checkbox)
+        self.settings_layout_mid_row.addSpacing(15)
+        self.settings_layout_mid_row.addWidget(self.move_mode_checkbox)
         self.settings_layout_mid_row.addStretch(1)
 
         # New layout for extensions
         settings_frame_bottom = QFrame(); settings_frame_bottom.setLayout(self.settings_layout_bottom_row)
         self.settings_layout_bottom_row.addWidget(self.extensions_label)
         self.settings_layout_bottom_row.addWidget(self.extensions_input, 1) # Make it stretch
+        self.settings_layout_bottom_row.addSpacing(15)
+        self.settings_layout_bottom_row.addWidget(self.timestamp_source_label)
+        self.settings_layout_bottom_row.addWidget(self.timestamp_source_combo)
+        self.settings_layout_bottom_row.addWidget(self.content_column_input)
+        self.settings_layout_bottom_row.addWidget(self.content_regex_input)
+
+        settings_frame_output = QFrame(); settings_frame_output.setLayout(self.settings_layout_output_row)
+        self.settings_layout_output_row.addWidget(self.output_format_label)
+        self.settings_layout_output_row.addWidget(self.output_format_combo)
+        self.settings_layout_output_row.addSpacing(15)
+        self.settings_layout_output_row.addWidget(self.archive_level_label); self.settings_layout_output_row.addWidget(self.archive_level_spinbox)
+        self.settings_layout_output_row.addWidget(self.archive_workers_label); self.settings_layout_output_row.addWidget(self.archive_workers_spinbox)
+        self.settings_layout_output_row.addWidget(self.archive_memory_label); self.settings_layout_output_row.addWidget(self.archive_memory_spinbox)
+        self.settings_layout_output_row.addSpacing(15)
+        self.settings_layout_output_row.addWidget(self.plan_processes_label); self.settings_layout_output_row.addWidget(self.plan_processes_spinbox)
+        self.settings_layout_output_row.addStretch(1)
 
         bottom_frame = QFrame(); bottom_frame.setLayout(self.bottom_layout)
         bottom_frame.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Maximum)
-        self.bottom_layout.addWidget(self.copy_button);
+        self.copy_row_layout.addWidget(self.copy_button,1); self.copy_row_layout.addWidget(self.export_plan_button)
+        self.bottom_layout.addLayout(self.copy_row_layout)
         self.bottom_layout.addWidget(self.progress_bar)
+        self.control_layout.addWidget(self.pause_button); self.control_layout.addWidget(self.cancel_button)
+        self.control_layout.addStretch(1)
+        self.control_layout.addWidget(self.max_mbps_label); self.control_layout.addWidget(self.max_mbps_spinbox)
+        self.control_layout.addWidget(self.max_stat_ops_label); self.control_layout.addWidget(self.max_stat_ops_spinbox)
+        self.bottom_layout.addLayout(self.control_layout)
         self.bottom_layout.addWidget(self.log_label); self.bottom_layout.addWidget(self.log_area)
 
         self.main_layout.addWidget(top_frame)
         self.main_layout.addWidget(settings_frame_top) # Add the rows
         self.main_layout.addWidget(settings_frame_mid)
         self.main_layout.addWidget(settings_frame_bottom) # Add the new extensions row
-        self.main_layout.addWidget(self.groups_scroll_area,1)
+        self.main_layout.addWidget(settings_frame_output)
+        search_frame = QFrame(); search_frame.setLayout(self.search_layout)
+        self.search_layout.addWidget(self.search_input,1); self.search_layout.addWidget(self.search_status_label)
+        self.search_layout.addWidget(self.search_prev_button); self.search_layout.addWidget(self.search_next_button)
+        self.search_layout.addWidget(self.search_select_button)
+        self.search_layout.addWidget(self.search_target_spinbox); self.search_layout.addWidget(self.search_move_button)
+        self.main_layout.addWidget(search_frame)
+        preview_frame = QFrame(); preview_frame.setLayout(self.preview_layout)
+        self.preview_layout.addWidget(self.preview_info_label); self.preview_layout.addWidget(self.preview_text,1)
+        self.groups_splitter.addWidget(self.groups_scroll_area); self.groups_splitter.addWidget(preview_frame)
+        self.groups_splitter.setStretchFactor(0,3); self.groups_splitter.setStretchFactor(1,2)
+        self.main_layout.addWidget(self.groups_splitter,1)
         self.main_layout.addWidget(bottom_frame)
 
-        self._apply_title_editing_state()
-        self.log("Application started. Select source directory.")
         self.main_layout.addWidget(bottom_frame)
         separator_line = QFrame()
         separator_line.setFrameShape(QFrame.HLine)
@@ -487,14 +2510,36 @@ class FileCascadeApp(QWidget):
         footer_label.setAlignment(Qt.AlignCenter)
         footer_label.setStyleSheet("color: gray; font-size: 10px; padding: 5px;")
         self.main_layout.addWidget(footer_label)
+
+    # --- Startup ---
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.time_to_first_window_ms is None:
+            self.time_to_first_window_ms = (time.perf_counter() - _STARTUP_T0) * 1000
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        # Non-essential setup runs after the first paint so the window appears sooner
+        self._apply_title_editing_state()
+        self.log("Application started. Select source directory.")
+        self.log(f"Window ready in {self.time_to_first_window_ms:.0f} ms.")
+        self.startup_finished.emit(self.time_to_first_window_ms)
     # --- Settings Handlers ---
     def _set_settings_enabled(self, enabled):
         self.threshold_spinbox.setEnabled(enabled and not self.manual_grouping_enabled)
         self.manual_group_checkbox.setEnabled(enabled)
         self.manual_group_count_spinbox.setEnabled(enabled and self.manual_grouping_enabled)
+        self._set_group_key_controls_enabled(enabled)
         self.folder_pattern_input.setEnabled(enabled)
         self.title_edit_checkbox.setEnabled(enabled)
+        self.move_mode_checkbox.setEnabled(enabled and self.archive_format == "folder")
+        self.output_format_combo.setEnabled(enabled)
+        self.plan_processes_spinbox.setEnabled(enabled and self.archive_format == "folder")
+        self._set_archive_controls_enabled(enabled and self.archive_format != "folder")
         self.extensions_input.setEnabled(enabled) # Enable/disable extension input
+        self.timestamp_source_combo.setEnabled(enabled)
+        self.content_column_input.setEnabled(enabled and self.timestamp_source == "content")
+        self.content_regex_input.setEnabled(enabled and self.timestamp_source == "content")
         self.log(f"Setting UI enabled={enabled}, title_editing_enabled={self.group_title_editing_enabled}")
         for ui in self.group_ui_elements:
             
@@ -511,11 +2556,25 @@ class FileCascadeApp(QWidget):
         self.log(f"Time threshold set to {value} minutes.")
 
     def _on_manual_toggle(self, state):
-        self.manual_grouping_enabled = (state == Qt.Checked)
+        self.manual_grouping_enabled = self.manual_group_checkbox.isChecked()
         self.manual_group_count_spinbox.setEnabled(self.manual_grouping_enabled)
         self.threshold_spinbox.setEnabled(not self.manual_grouping_enabled)
+        self._set_group_key_controls_enabled(True)
         self.log(f"Manual grouping {'enabled' if self.manual_grouping_enabled else 'disabled'}.")
 
+    def _set_group_key_controls_enabled(self, enabled):
+        enabled = enabled and not self.manual_grouping_enabled
+        cls = GROUPING_KEYS.get(self.group_key_combo.currentData())
+        self.group_key_combo.setEnabled(enabled)
+        self.group_key_option_input.setEnabled(enabled and bool(cls and cls.option_hint))
+        self.group_key_time_checkbox.setEnabled(enabled and cls is not None)
+
+    def _on_group_key_changed(self, index):
+        cls = GROUPING_KEYS.get(self.group_key_combo.itemData(index))
+        self.group_key_option_input.setPlaceholderText(cls.option_hint if cls else "")
+        self._set_group_key_controls_enabled(True)
+        self.log(f"Group by set to: {cls.label if cls else 'time gap'}. Apply grouping settings to regroup.")
+
     def _on_manual_count_changed(self, value):
         self.manual_group_count = value
         self.log(f"Manual group count set to {value}.")
@@ -534,6 +2593,31 @@ class FileCascadeApp(QWidget):
         #     self.log("Extensions changed. Re-scanning source directory...")
         #     self.start_file_scan()
 
+    def _on_timestamp_source_changed(self, index):
+        self.timestamp_source = self.timestamp_source_combo.itemData(index)
+        from_content = self.timestamp_source == "content"
+        self.content_column_input.setEnabled(from_content)
+        self.content_regex_input.setEnabled(from_content)
+        self.log(f"Timestamp source set to: {TIMESTAMP_SOURCES[self.timestamp_source]}. Re-scan source to apply.")
+
+    def _on_move_mode_toggle(self, state):
+        self.move_mode_enabled = self.move_mode_checkbox.isChecked()
+        self.copy_button.setText("Move Files to Destination" if self.move_mode_enabled else "Copy Files to Destination")
+        self.log(f"Move mode {'enabled' if self.move_mode_enabled else 'disabled'}.")
+
+    def _set_archive_controls_enabled(self, enabled):
+        for w in (self.archive_level_spinbox, self.archive_workers_spinbox, self.archive_memory_spinbox):
+            w.setEnabled(enabled)
+
+    def _on_output_format_changed(self, index):
+        self.archive_format = self.output_format_combo.itemData(index)
+        archiving = self.archive_format != "folder"
+        self._set_archive_controls_enabled(archiving)
+        if archiving and self.move_mode_checkbox.isChecked():
+            self.move_mode_checkbox.setChecked(False)
+        self.move_mode_checkbox.setEnabled(not archiving)
+        self.plan_processes_spinbox.setEnabled(not archiving)
+        self.log(f"Output set to: {ARCHIVE_FORMATS[self.archive_format]}.")
 
     def _on_title_edit_toggle(self, state):
         print(f"DEBUG: Title edit toggle called with state={state}")
@@ -568,6 +2652,7 @@ class FileCascadeApp(QWidget):
 
     # --- Display & Manage Groups --- 
     def clear_groups_display(self):
+        self._highlighted_items = []; self._search_items = None
         self.groups_widgets.clear()
         self.group_ui_elements.clear()
         while self.groups_area_layout.count():
@@ -578,7 +2663,7 @@ class FileCascadeApp(QWidget):
             del it
         self.placeholder_label = None
 
-    def display_groups(self, groups):
+    def display_groups(self, groups, keys=None):
         self.clear_groups_display()
         if not groups:
             lbl = QLabel("No file groups to display (check source/extensions).") 
@@ -597,9 +2682,9 @@ class FileCascadeApp(QWidget):
             add.setFixedSize(20,20); rm.setFixedSize(20,20)
             hl.addWidget(te,1); hl.addWidget(add); hl.addWidget(rm)
             hdr = QWidget(); hdr.setLayout(hl)
-            lw = DraggableListWidget(); lw.setObjectName(f"group_list_{idx+1}"); lw.setMinimumHeight(80)
-            lw.item_dropped.connect(self.on_item_dropped)
-            self.group_ui_elements.append({'header_widget': hdr, 'title_edit': te, 'add_btn': add, 'remove_btn': rm, 'list_widget': lw})
+            lw = self._create_group_list_widget(); lw.setObjectName(f"group_list_{idx+1}")
+            self.group_ui_elements.append({'header_widget': hdr, 'title_edit': te, 'add_btn': add, 'remove_btn': rm, 'list_widget': lw,
+                                           'group_key': keys[idx] if keys else None})
             self.groups_widgets.append(lw)
             for fi in grp:
                 ts = fi['mod_time_dt'].strftime('%Y-%m-%d %H:%M:%S')
@@ -620,6 +2705,12 @@ class FileCascadeApp(QWidget):
         self.log(f"Displayed {len(self.groups_widgets)} groups.")
         self.check_copy_button_state()
 
+    def _create_group_list_widget(self):
+        lw = DraggableListWidget(); lw.setMinimumHeight(80)
+        lw.item_dropped.connect(self.on_item_dropped)
+        lw.currentItemChanged.connect(lambda cur, _prev, lw=lw: self.preview_item(lw, cur))
+        return lw
+
     def add_group_below(self, above):
         self.log(f"Adding new group below {above+1}")
         idx = above+1
@@ -629,8 +2720,8 @@ class FileCascadeApp(QWidget):
         add.setToolTip("Add group below"); rm.setToolTip("Remove this group"); add.setFixedSize(20,20); rm.setFixedSize(20,20)
         hl.addWidget(te,1); hl.addWidget(add); hl.addWidget(rm)
         hdr=QWidget(); hdr.setLayout(hl)
-        lw=DraggableListWidget(); lw.setMinimumHeight(80); lw.item_dropped.connect(self.on_item_dropped)
-        new_ui={'header_widget':hdr,'title_edit':te,'add_btn':add,'remove_btn':rm,'list_widget':lw}
+        lw=self._create_group_list_widget()
+        new_ui={'header_widget':hdr,'title_edit':te,'add_btn':add,'remove_btn':rm,'list_widget':lw,'group_key':None}
         self.group_ui_elements.insert(idx,new_ui); self.groups_widgets.insert(idx,lw)
         above_widget=self.group_ui_elements[above]['list_widget']
         pos=self.groups_area_layout.indexOf(above_widget)+1
@@ -680,15 +2771,16 @@ class FileCascadeApp(QWidget):
                 te.setText(f"{DEFAULT_GROUP_TITLE_PREFIX} {gi+1}")
         else:
             st, et = "N/A", "N/A"
-            if cnt > 0 and self.original_scanned_files:
+            if cnt > 0 and self.scanned_by_path:
                 paths = [lw.item(i).data(Qt.UserRole) for i in range(cnt)]
-                od = {str(f['path']): f for f in self.original_scanned_files}
-                infos = [od[str(p)] for p in paths if str(p) in od]
+                od = self.scanned_by_path
+                infos = [od[p] for p in paths if p in od]
                 if infos:
                     infos.sort(key=lambda x: x['mod_time_ts'])
                     st = infos[0]['mod_time_dt'].strftime('%H:%M:%S')
                     et = infos[-1]['mod_time_dt'].strftime('%H:%M:%S')
-            new = f"{DEFAULT_GROUP_TITLE_PREFIX} {gi+1} ({cnt} files) [{st} - {et}]"
+            key = f": {ui['group_key']}" if ui.get('group_key') is not None else ""
+            new = f"{DEFAULT_GROUP_TITLE_PREFIX} {gi+1}{key} ({cnt} files) [{st} - {et}]"
             if te.text() != new:
                 te.setText(new)
                 te.update()  # Force UI refresh
@@ -696,6 +2788,234 @@ class FileCascadeApp(QWidget):
     def update_all_group_labels(self):
         for i in range(len(self.group_ui_elements)):
             self.update_single_group_label(i)
+        self._invalidate_search_items()
+
+    # --- Search ---
+    @Slot(object)
+    def set_search_index(self, index):
+        self.search_index = index
+        self.search_input.setEnabled(True)
+        self.log(f"Search index ready ({len(index)} files).")
+
+    def _set_search_actions_enabled(self, enabled):
+        for w in (self.search_prev_button, self.search_next_button, self.search_select_button,
+                  self.search_target_spinbox, self.search_move_button):
+            w.setEnabled(enabled)
+
+    def _invalidate_search_items(self):
+        # Groups changed: item lookup and highlights are rebuilt on next use
+        self._search_items = None
+        self.search_target_spinbox.setRange(1, max(1, len(self.group_ui_elements)))
+        if self.search_matches:
+            self.search_timer.start()
+
+    def _ensure_search_items(self):
+        if self._search_items is None:
+            self._search_items = {}
+            for gi, ui in enumerate(self.group_ui_elements):
+                lw = ui['list_widget']
+                for r in range(lw.count()):
+                    it = lw.item(r)
+                    self._search_items[it.data(Qt.UserRole)] = (gi, it)
+        return self._search_items
+
+    def _clear_highlights(self):
+        for it in self._highlighted_items:
+            try:
+                it.setBackground(QBrush())
+            except RuntimeError:
+                pass # Item was deleted with its group
+        self._highlighted_items = []
+
+    @Slot()
+    def run_search(self):
+        self._clear_highlights()
+        query = self.search_input.text()
+        if not self.search_index or not query.strip():
+            self.search_matches = []; self.search_cursor = -1
+            self.search_status_label.setText("")
+            self._set_search_actions_enabled(False)
+            return
+        t0 = time.perf_counter()
+        ids = self.search_index.search(query)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        items = self._ensure_search_items()
+        paths = self.search_index.paths
+        # Keep display order: by group, then row
+        located = sorted(((items[paths[i]][0], items[paths[i]][1].listWidget().row(items[paths[i]][1]), paths[i])
+                          for i in ids if paths[i] in items), key=lambda x: (x[0], x[1]))
+        self.search_matches = [p for _, _, p in located]
+        self.search_cursor = -1
+        brush = QBrush(QColor(SEARCH_HIGHLIGHT_COLOR))
+        for p in self.search_matches[:SEARCH_MAX_HIGHLIGHT]:
+            it = items[p][1]
+            it.setBackground(brush)
+            self._highlighted_items.append(it)
+        groups_hit = len({g for g, _, _ in located})
+        self.search_status_label.setText(f"{len(self.search_matches)} matches in {groups_hit} groups ({elapsed_ms:.1f} ms)")
+        self._set_search_actions_enabled(bool(self.search_matches))
+
+    def schedule_search(self, _text=None):
+        self.search_timer.start()
+
+    def next_match(self):
+        self.jump_to_match(1)
+
+    def prev_match(self):
+        self.jump_to_match(-1)
+
+    def jump_to_match(self, step):
+        if not self.search_matches:
+            return
+        self.search_cursor = (self.search_cursor + step) % len(self.search_matches)
+        located = self._ensure_search_items().get(self.search_matches[self.search_cursor])
+        if not located:
+            return
+        gi, it = located
+        lw = it.listWidget()
+        self.groups_scroll_area.ensureWidgetVisible(self.group_ui_elements[gi]['header_widget'])
+        self.groups_scroll_area.ensureWidgetVisible(lw)
+        lw.setCurrentItem(it); lw.scrollToItem(it); lw.setFocus()
+        self.search_status_label.setText(f"{self.search_cursor+1}/{len(self.search_matches)} in {DEFAULT_GROUP_TITLE_PREFIX} {gi+1}")
+
+    def select_all_matches(self):
+        items = self._ensure_search_items()
+        for ui in self.group_ui_elements:
+            ui['list_widget'].clearSelection()
+        for p in self.search_matches:
+            if p in items:
+                items[p][1].setSelected(True)
+        self.log(f"Selected {len(self.search_matches)} matching files.")
+
+    def move_matches_to_group(self):
+        target_gi = self.search_target_spinbox.value() - 1
+        if not self.search_matches or not (0 <= target_gi < len(self.group_ui_elements)):
+            return
+        target = self.group_ui_elements[target_gi]['list_widget']
+        items = self._ensure_search_items()
+        self._clear_highlights()
+        by_widget = {}
+        for p in self.search_matches:
+            if p not in items:
+                continue
+            gi, it = items[p]
+            if gi != target_gi:
+                by_widget.setdefault(gi, []).append(it)
+        moved = 0
+        for gi, its in by_widget.items():
+            lw = self.group_ui_elements[gi]['list_widget']
+            for r in sorted((lw.row(it) for it in its), reverse=True):
+                target.addItem(lw.takeItem(r))
+                moved += 1
+        self.log(f"Moved {moved} matching files to {DEFAULT_GROUP_TITLE_PREFIX} {target_gi+1}.")
+        self.update_all_group_labels()
+        self.check_copy_button_state()
+
+    # --- File Preview ---
+    def preview_item(self, lw, item):
+        if item is None:
+            return
+        path = item.data(Qt.UserRole)
+        if not isinstance(path, Path):
+            return
+        self._preview_path = str(path)
+        cached = self.preview_cache.get(self._preview_path)
+        if cached is not None:
+            self._show_preview(cached)
+            wanted = []
+        else:
+            self.preview_info_label.setText(f"{path.name}\nLoading...")
+            self.preview_text.clear()
+            wanted = [self._preview_path]
+        # Neighbours are loaded ahead so arrow-key browsing hits the cache
+        row = lw.row(item)
+        for offset in range(1, PREVIEW_PREFETCH + 1):
+            for r in (row + offset, row - offset):
+                if 0 <= r < lw.count():
+                    neighbour = lw.item(r).data(Qt.UserRole)
+                    if isinstance(neighbour, Path) and str(neighbour) not in self.preview_cache:
+                        wanted.append(str(neighbour))
+        if not wanted:
+            return
+        if self.preview_worker is None:
+            self.preview_worker = FilePreviewWorker()
+            self.preview_worker.ready.connect(self.on_preview_ready)
+            self.preview_worker.start()
+        self.preview_worker.request(wanted)
+
+    @Slot(str, object)
+    def on_preview_ready(self, path, preview):
+        self.preview_cache.put(path, preview)
+        if path == self._preview_path:
+            self._show_preview(preview)
+
+    def _show_preview(self, preview):
+        name = Path(preview['path']).name
+        if 'error' in preview:
+            self.preview_info_label.setText(f"{name}\nCannot read file: {preview['error']}")
+            self.preview_text.clear()
+            return
+
+        def fmt(ts):
+            return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+
+        size = format_size(preview['size'])
+        if preview['size'] >= 1024:
+            size += f" ({preview['size']:,} bytes)"
+        info = [name, f"Size: {size}",
+                f"Modified: {fmt(preview['mtime'])}", f"Changed: {fmt(preview['ctime'])}"]
+        if preview['birthtime'] is not None:
+            info.append(f"Created: {fmt(preview['birthtime'])}")
+        info.append(preview['path'])
+        self.preview_info_label.setText("\n".join(info))
+        if preview['text'] is None:
+            self.preview_text.setPlainText("(binary file)")
+        else:
+            self.preview_text.setPlainText(preview['text'] + ("\n..." if preview['truncated'] else ""))
+
+    def closeEvent(self, event):
+        if self.preview_worker is not None:
+            self.preview_worker.stop()
+            self.preview_worker = None
+        super().closeEvent(event)
+
+    # --- Pause/Cancel & Throttling ---
+    def _start_worker_control(self):
+        self.worker_control = WorkerControl(self.max_mbps_spinbox.value() * 1024 * 1024,
+                                            self.max_stat_ops_spinbox.value())
+        self.pause_button.setText("Pause")
+        self.pause_button.setEnabled(True); self.cancel_button.setEnabled(True)
+        return self.worker_control
+
+    def _stop_worker_control(self):
+        self.worker_control = None
+        self.pause_button.setText("Pause")
+        self.pause_button.setEnabled(False); self.cancel_button.setEnabled(False)
+
+    def _on_pause_clicked(self):
+        if not self.worker_control:
+            return
+        if self.worker_control.is_paused():
+            self.worker_control.resume()
+            self.pause_button.setText("Pause")
+            self.log("Resumed.")
+        else:
+            self.worker_control.pause()
+            self.pause_button.setText("Resume")
+            self.log("Paused. Work stops at the next safe point.")
+
+    def _on_cancel_clicked(self):
+        if not self.worker_control:
+            return
+        self.worker_control.cancel()
+        self.pause_button.setEnabled(False); self.cancel_button.setEnabled(False)
+        self.log("Cancelling... Work stops at the next safe point.")
+
+    def _on_limits_changed(self, _value):
+        mbps, stat_ops = self.max_mbps_spinbox.value(), self.max_stat_ops_spinbox.value()
+        if self.worker_control:
+            self.worker_control.set_limits(mbps * 1024 * 1024, stat_ops)
+        self.log(f"Limits set to {mbps or 'unlimited'} MB/s, {stat_ops or 'unlimited'} stat/s.")
 
     # --- Copy Handlers --- 
     @Slot(int,int,str)
@@ -706,6 +3026,7 @@ class FileCascadeApp(QWidget):
     @Slot(bool,str)
     def on_copy_finished(self, success, msg):
         self.log(msg)
+        self._stop_worker_control()
         self.source_button.setEnabled(True)
         self.dest_button.setEnabled(True)
         self._set_settings_enabled(True)
@@ -713,8 +3034,10 @@ class FileCascadeApp(QWidget):
             ui['list_widget'].setEnabled(True)
             ui['add_btn'].setEnabled(True)
             ui['remove_btn'].setEnabled(True)
-        self.copy_button.setEnabled(True)
+        self.copy_button.setEnabled(True); self.export_plan_button.setEnabled(True)
         self.progress_bar.setVisible(False)
+        if self.move_mode_enabled:
+            self.log("Source files were moved. Re-scan source to refresh the groups.")
         if success:
             QMessageBox.information(self,"Copy Complete",msg)
         else:
@@ -728,6 +3051,25 @@ class FileCascadeApp(QWidget):
         self.check_copy_button_state()
 
     # --- File Copy Trigger --- 
+    def _collect_copy_groups(self):
+        final_groups=[]; names=[]; total=0
+        for idx, ui in enumerate(self.group_ui_elements):
+            lw=ui['list_widget']; files=[]
+            for i in range(lw.count()):
+                it=lw.item(i); p=it.data(Qt.UserRole)
+                if isinstance(p,Path): files.append(p); total+=1
+                else: self.log(f"Invalid item skipped: {it.text()}")
+            if files:
+                final_groups.append(files)
+                if self.group_title_editing_enabled:
+                    nm=ui['title_edit'].text().strip() or f"{DEFAULT_GROUP_TITLE_PREFIX}_{idx+1}_Untitled"
+                else:
+                    nm=folder_name_for(self.folder_pattern_input.text(), idx+1, ui.get('group_key'))
+                names.append(nm)
+            else:
+                self.log(f"Skipping empty group {idx+1}")
+        return final_groups, names, total
+
     def start_copy(self):
         if not self.dest_dir:
             QMessageBox.warning(self,"Destination Missing","Select destination directory.")
@@ -744,44 +3086,109 @@ class FileCascadeApp(QWidget):
             except Exception as e:
                 QMessageBox.critical(self,"Error",f"Could not create destination: {e}")
                 return
-        final_groups=[]; names=[]; total=0
-        for idx, ui in enumerate(self.group_ui_elements):
-            lw=ui['list_widget']; files=[]
-            for i in range(lw.count()):
-                it=lw.item(i); p=it.data(Qt.UserRole)
-                if isinstance(p,Path): files.append(p); total+=1
-                else: self.log(f"Invalid item skipped: {it.text()}")
-            if files:
-                final_groups.append(files)
-                if self.group_title_editing_enabled:
-                    nm=ui['title_edit'].text().strip() or f"{DEFAULT_GROUP_TITLE_PREFIX}_{idx+1}_Untitled"
-                else:
-                    pat=self.folder_pattern_input.text()
-                    if "{num}" not in pat: pat=DEFAULT_FOLDER_NAME_PATTERN
-                    nm=pat.replace("{num}",str(idx+1))
-                names.append(nm)
-            else:
-                self.log(f"Skipping empty group {idx+1}")
+        final_groups, names, total = self._collect_copy_groups()
         if total==0:
             QMessageBox.information(self,"Empty Groups","All groups are empty.")
             return
+        if self.move_mode_enabled:
+            reply=QMessageBox.question(self,"Move Files?",
+                f"Move {total} files to '{self.dest_dir}'? The originals will be removed from the source.",
+                QMessageBox.Yes|QMessageBox.No, QMessageBox.No)
+            if reply==QMessageBox.No: return
         # disable UI
         self.source_button.setEnabled(False); self.dest_button.setEnabled(False)
-        self.copy_button.setEnabled(False); self._set_settings_enabled(False); self.regroup_button.setEnabled(False)
+        self.copy_button.setEnabled(False); self.export_plan_button.setEnabled(False)
+        self._set_settings_enabled(False); self.regroup_button.setEnabled(False)
         for ui in self.group_ui_elements:
             ui['list_widget'].setEnabled(False); ui['add_btn'].setEnabled(False); ui['remove_btn'].setEnabled(False)
         self.progress_bar.setVisible(True); self.progress_bar.setRange(0,total); self.progress_bar.setValue(0)
-        self.log(f"Starting copy: {len(final_groups)} groups, {total} files...")
-        self.copy_thread = FileCopyWorker(final_groups, self.dest_dir, names)
+        processes=self.plan_processes_spinbox.value()
+        if self.archive_format=="folder" and processes>1:
+            self.start_plan_processes(final_groups, names, processes)
+            return
+        self.log(f"Starting {'move' if self.move_mode_enabled else 'copy'}: {len(final_groups)} groups, {total} files...")
+        self.copy_thread = FileCopyWorker(final_groups, self.dest_dir, names, move=self.move_mode_enabled,
+                                          archive_format=self.archive_format,
+                                          archive_level=self.archive_level_spinbox.value(),
+                                          archive_workers=self.archive_workers_spinbox.value(),
+                                          archive_memory_mb=self.archive_memory_spinbox.value(),
+                                          control=self._start_worker_control())
         self.copy_thread.progress.connect(self.update_copy_progress)
         self.copy_thread.finished.connect(self.on_copy_finished)
         self.copy_thread.start()
 
+    # --- Copy Plans ---
+    def export_plan(self):
+        if not self.dest_dir:
+            QMessageBox.warning(self,"Destination Missing","Select destination directory.")
+            return
+        if self.archive_format!="folder":
+            QMessageBox.information(self,"Folder Output Only","Copy plans write into group folders; select Folders output.")
+            return
+        final_groups, names, total = self._collect_copy_groups()
+        if total==0:
+            QMessageBox.information(self,"Empty Groups","All groups are empty.")
+            return
+        path,_=QFileDialog.getSaveFileName(self,"Export Copy Plan",str(Path(self.dest_dir)/PLAN_FILE_NAME),"Copy plans (*.json)")
+        if not path: return
+        try:
+            plan=CopyPlan.from_groups(final_groups, names, self.dest_dir, self.move_mode_enabled)
+            plan.save(Path(path))
+        except Exception as e:
+            QMessageBox.critical(self,"Error",f"Could not export plan: {e}")
+            return
+        self.log(f"Exported plan with {len(plan.entries)} files in {plan.shards} shards to {path}. "
+                 f"Run it from any host that sees the same paths with: --run-plan \"{path}\"")
+
+    def start_plan_processes(self, final_groups, names, processes):
+        try:
+            self.plan=CopyPlan.from_groups(final_groups, names, self.dest_dir, self.move_mode_enabled,
+                                           shards=processes*PLAN_SHARDS_PER_PROCESS)
+            self.plan.save(Path(self.dest_dir)/PLAN_FILE_NAME)
+            self.plan_processes=launch_plan_processes(self.plan, processes, self.max_mbps_spinbox.value(),
+                                                      self.max_stat_ops_spinbox.value())
+        except Exception as e:
+            self.plan_processes=[]
+            self.on_copy_finished(False, f"Could not start plan processes: {e}")
+            return
+        self.worker_control=PlanProcessControl(self.plan_processes)
+        self.pause_button.setText("Pause")
+        self.pause_button.setEnabled(True); self.cancel_button.setEnabled(True)
+        self.progress_bar.setRange(0,len(self.plan.entries))
+        self._plan_shards_logged=-1
+        self.log(f"Starting {'move' if self.move_mode_enabled else 'copy'} plan: {len(self.plan.entries)} files "
+                 f"in {self.plan.shards} shards across {processes} processes. Logs: {self.plan.state_dir}")
+        self.plan_timer.start()
+
+    def _poll_plan_progress(self):
+        status=plan_status(self.plan)
+        self.progress_bar.setValue(status['done'])
+        if status['shards_done']!=self._plan_shards_logged:
+            self._plan_shards_logged=status['shards_done']
+            self.log(f"Plan: {status['shards_done']}/{status['shards']} shards done, "
+                     f"{status['done']}/{status['total']} files.")
+        if any(proc.poll() is None for proc in self.plan_processes):
+            return
+        self.plan_timer.stop()
+        self.plan_processes=[]
+        if status['shards_failed']:
+            self.on_copy_finished(False, f"Plan finished. {status['done']}/{status['total']} files, "
+                                         f"{status['errors']} errors in {status['shards_failed']} shards. "
+                                         f"Run it again to retry them; worker logs are in {self.plan.state_dir}")
+        elif status['shards_done']<status['shards']:
+            self.on_copy_finished(False, f"Plan stopped with {status['shards_done']}/{status['shards']} shards done, "
+                                         f"{status['done']}/{status['total']} files. Run it again to resume; "
+                                         f"worker logs are in {self.plan.state_dir}")
+        else:
+            shutil.rmtree(self.plan.state_dir, ignore_errors=True)
+            self.plan.path.unlink(missing_ok=True)
+            self.on_copy_finished(True, f"Plan finished. {status['done']}/{status['total']} files "
+                                        f"{'moved' if self.plan.move else 'copied'}.")
+
     # --- Logging --- 
     def log(self, message):
         ts=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.log_area.append(f"[{ts}] {message}")
-        QApplication.processEvents()
         self.log_area.verticalScrollBar().setValue(self.log_area.verticalScrollBar().maximum())
 
 
@@ -794,6 +3201,8 @@ class FileCascadeApp(QWidget):
             self.log(f"Source directory selected: {d}")
             self.clear_groups_display();
             self.original_scanned_files.clear(); self.regroup_button.setEnabled(False)
+            self.scanned_by_path = {}; self.search_index = None
+            self.search_input.clear(); self.search_input.setEnabled(False)
             self.placeholder_label = QLabel("Scanning... Please wait.")
             self.groups_area_layout.addWidget(self.placeholder_label,0,Qt.AlignTop)
             QApplication.processEvents();
@@ -814,6 +3223,7 @@ class FileCascadeApp(QWidget):
             cnt=sum(lw.count() for lw in self.groups_widgets)
             if cnt==0: en=False
         self.copy_button.setEnabled(en)
+        self.export_plan_button.setEnabled(en)
 
     def check_regroup_button_state(self):
         self.regroup_button.setEnabled(bool(self.original_scanned_files))
@@ -837,18 +3247,32 @@ class FileCascadeApp(QWidget):
              self.source_button.setEnabled(True); self.dest_button.setEnabled(True)
              return
 
+        if self.timestamp_source == "content" and self.content_regex_input.text().strip():
+            try:
+                re.compile(self.content_regex_input.text().strip())
+            except re.error as e:
+                QMessageBox.warning(self, "Invalid Regex", f"Timestamp regex is invalid: {e}")
+                self.log("Scan cancelled: Invalid timestamp regex.")
+                self.source_button.setEnabled(True); self.dest_button.setEnabled(True)
+                return
+
         self.log(f"Starting scan with extensions: {', '.join(extensions_list)}")
 
         self.source_button.setEnabled(False); self.dest_button.setEnabled(False);
-        self.copy_button.setEnabled(False)
+        self.copy_button.setEnabled(False); self.export_plan_button.setEnabled(False)
+        self.preview_cache.clear() # Files may have changed since they were previewed
         self._set_settings_enabled(False); self.regroup_button.setEnabled(False)
         for ui in self.group_ui_elements:
             ui['list_widget'].setEnabled(False); ui['add_btn'].setEnabled(False); ui['remove_btn'].setEnabled(False)
         self.progress_bar.setVisible(True); self.progress_bar.setRange(0,0) 
 
         # Pass extensions to the worker
-        self.scanner_thread = FileScannerWorker(self.source_dir, extensions_list)
+        self.scanner_thread = FileScannerWorker(
+            self.source_dir, extensions_list, self.timestamp_source,
+            self.content_column_input.text(), self.content_regex_input.text(), self.timestamp_cache,
+            self._start_worker_control())
         self.scanner_thread.progress.connect(self.log)
+        self.scanner_thread.index_ready.connect(self.set_search_index)
         self.scanner_thread.result.connect(self.process_scan_results)
         self.scanner_thread.finished.connect(self.on_scan_finished)
         self.scanner_thread.start()
@@ -856,6 +3280,7 @@ class FileCascadeApp(QWidget):
     @Slot(list)
     def process_scan_results(self, files_data):
         self.original_scanned_files = files_data
+        self.scanned_by_path = {f['path']: f for f in files_data}
         if self.placeholder_label:
             self.placeholder_label.deleteLater(); self.placeholder_label=None
             QApplication.processEvents()
@@ -869,6 +3294,7 @@ class FileCascadeApp(QWidget):
 
     @Slot()
     def on_scan_finished(self):
+        self._stop_worker_control()
         self.source_button.setEnabled(True); self.dest_button.setEnabled(True)
         self._set_settings_enabled(True)
         for ui in self.group_ui_elements:
@@ -888,22 +3314,32 @@ class FileCascadeApp(QWidget):
         self.apply_grouping(self.original_scanned_files)
 
     def apply_grouping(self, files):
+        keys=None
         if self.manual_grouping_enabled:
             grps=self.group_files_manually(files,self.manual_group_count)
+        elif self.group_key_combo.currentData():
+            keyed=self.group_files_by_key(files)
+            if keyed is None: return
+            keys=[k for k,_ in keyed]; grps=[g for _,g in keyed]
         else:
             grps=self.group_files_by_time(files,self.time_threshold_minutes)
-        self.display_groups(grps)
+        self.display_groups(grps, keys)
+
+    def group_files_by_key(self, files):
+        try:
+            gk=GROUPING_KEYS[self.group_key_combo.currentData()](self.group_key_option_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self,"Invalid Grouping Key",str(e))
+            return None
+        minutes=self.time_threshold_minutes if self.group_key_time_checkbox.isChecked() else None
+        self.log(f"Grouping by {gk.label.lower()}" + (f", split by time ({minutes} min)..." if minutes else "..."))
+        keyed=group_files_by_key(files, gk, minutes)
+        self.log(f"{len(keyed)} groups formed.")
+        return keyed
 
     def group_files_by_time(self, files, th):
         self.log(f"Grouping by time ({th} min)...")
-        if not files: return []
-        groups=[]; cur=[files[0]]; last=files[0]['mod_time_ts']
-        for fi in files[1:]:
-            if fi['mod_time_ts'] - last <= timedelta(minutes=th).total_seconds():
-                cur.append(fi); last=fi['mod_time_ts']
-            else:
-                groups.append(cur); cur=[fi]; last=fi['mod_time_ts']
-        if cur: groups.append(cur)
+        groups=list(iter_time_groups(files, th))
         self.log(f"{len(groups)} groups formed.")
         return groups
 
@@ -918,9 +3354,225 @@ class FileCascadeApp(QWidget):
         self.log(f"{len(grps)} manual groups created.")
         return [g for g in grps if g]
 
-# --- Application ---
-if __name__ == '__main__':
+# --- Command Line ---
+CLI_CONTROL_HELP = "Commands: pause, resume, cancel, mbps <N>, stats <N> (0 = unlimited)"
+
+
+def _read_control_commands(control, stream):
+    # Lets an operator adjust a running headless job from the terminal
+    for line in stream:
+        parts = line.strip().lower().split()
+        if not parts:
+            continue
+        cmd, arg = parts[0], parts[1] if len(parts) > 1 else ""
+        if cmd == "pause":
+            control.pause(); print("Paused.")
+        elif cmd == "resume":
+            control.resume(); print("Resumed.")
+        elif cmd == "cancel":
+            control.cancel(); print("Cancelling...")
+        elif cmd == "mbps" and arg.isdigit():
+            control.set_limits(max_bytes_per_sec=int(arg) * 1024 * 1024); print(f"Bandwidth limit: {arg} MB/s" if int(arg) else "Bandwidth limit: unlimited")
+        elif cmd == "stats" and arg.isdigit():
+            control.set_limits(max_stat_ops_per_sec=int(arg)); print(f"Stat limit: {arg} ops/s" if int(arg) else "Stat limit: unlimited")
+        else:
+            print(CLI_CONTROL_HELP)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="FileCascade: group files by time and copy them into folders. "
+                    "Runs the GUI unless --source and --dest are given.")
+    parser.add_argument("--benchmark-startup", action="store_true",
+                        help="Open the window, print the time to first window and exit")
+    parser.add_argument("--source", help="Source directory to scan (headless mode)")
+    parser.add_argument("--dest", help="Destination directory (headless mode)")
+    parser.add_argument("--extensions", default=DEFAULT_EXTENSIONS, help="Comma-separated extensions")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_TIME_THRESHOLD_MINUTES, help="Time gap in minutes")
+    parser.add_argument("--pattern", default=DEFAULT_FOLDER_NAME_PATTERN,
+                        help="Folder name pattern (use {num}, and {key} with --group-key)")
+    parser.add_argument("--group-key", choices=list(GROUPING_KEYS),
+                        help="Group files sharing this key instead of by time gap")
+    parser.add_argument("--group-key-option", default="",
+                        help="Regex for --group-key regex, or bucket width (e.g. 10MB) for --group-key size")
+    parser.add_argument("--group-key-time", action="store_true",
+                        help="With --group-key, also split each key's files by the --threshold time gap")
+    parser.add_argument("--timestamp", choices=list(TIMESTAMP_SOURCES), default=DEFAULT_TIMESTAMP_SOURCE)
+    parser.add_argument("--content-column", default="", help="CSV column for --timestamp content")
+    parser.add_argument("--content-regex", default="", help="Regex for --timestamp content")
+    parser.add_argument("--move", action="store_true", help="Move files instead of copying")
+    parser.add_argument("--output", choices=available_archive_formats(), default="folder", help="Folders or per-group archives")
+    parser.add_argument("--max-mbps", type=int, default=0, help="Bandwidth limit in MB/s (0 = unlimited)")
+    parser.add_argument("--max-stat-ops", type=int, default=0, help="Stat operations per second (0 = unlimited)")
+    parser.add_argument("--memory-budget", type=int, default=0,
+                        help="Max scan records held in memory; beyond this, sorted runs spill to disk "
+                             "and groups are copied as they stream out (0 = unbounded)")
+    parser.add_argument("--export-plan", metavar="PLAN", help="Write a copy plan instead of copying (headless mode)")
+    parser.add_argument("--plan-shards", type=int, default=DEFAULT_PLAN_SHARDS, help="Shards in an exported plan")
+    parser.add_argument("--run-plan", metavar="PLAN",
+                        help="Claim and run shards of a copy plan; start one per process or host to share the work")
+    parser.add_argument("--reclaim-after", type=int, default=0,
+                        help="With --run-plan, take over shards whose claim has not been renewed for this many "
+                             f"seconds (0 = never, otherwise at least {3 * PLAN_HEARTBEAT_SECONDS})")
+    parser.add_argument("--plan-status", metavar="PLAN", help="Print the combined progress of a copy plan")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running: group files as they arrive and copy each group once no file "
+                             "has arrived for --threshold minutes (headless mode)")
+    parser.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS,
+                        help="With --watch, seconds a file must stop changing before it is grouped")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll instead of using inotify")
+    return parser
+
+
+def _start_cli_control(args):
+    control = WorkerControl(args.max_mbps * 1024 * 1024, args.max_stat_ops)
+    signal.signal(signal.SIGINT, lambda *_: control.cancel())
+    threading.Thread(target=_read_control_commands, args=(control, sys.stdin), daemon=True).start()
+    print(f"{CLI_CONTROL_HELP}. Ctrl+C cancels; rerun to resume.", flush=True)
+    return control
+
+
+def run_plan_headless(args):
+    control = _start_cli_control(args)
+    try:
+        return 0 if run_plan(args.run_plan, control, lambda m: print(m, flush=True), args.reclaim_after) else 1
+    except (OSError, ValueError) as e:
+        print(f"Could not run plan: {e}")
+        return 2
+
+
+def run_watch(args):
+    control = _start_cli_control(args)
+    signal.signal(signal.SIGTERM, lambda *_: control.cancel())
+    daemon = WatchDaemon(args.source, args.dest, args.extensions.split(','), args.threshold, args.pattern,
+                         args.timestamp, args.content_column, args.content_regex, args.move, args.output,
+                         control, lambda m: print(m, flush=True), args.settle, not args.poll)
+    daemon.run()
+    return 0
+
+
+def print_plan_status(path):
+    try:
+        status = plan_status(CopyPlan.load(path))
+    except (OSError, ValueError) as e:
+        print(f"Could not read plan: {e}")
+        return 2
+    print(f"{status['done']}/{status['total']} files, {status['errors']} errors. "
+          f"Shards: {status['shards_done']}/{status['shards']} done ({status['shards_failed']} failed), "
+          f"{status['shards_running']} running.")
+    return 0 if status['shards_done'] == status['shards'] and not status['shards_failed'] else 1
+
+
+def run_headless(args):
+    control = _start_cli_control(args)
+    bounded = args.memory_budget > 0
+    # The timestamp cache keeps an entry per scanned file in memory, so bounded scans skip it
+    scanner = FileScannerWorker(args.source, args.extensions.split(','), args.timestamp,
+                                args.content_column, args.content_regex,
+                                None if bounded else TimestampCache(), control, args.memory_budget)
+    scanner.progress.connect(print)
+    scanner.run()
+    records = scanner.sorted_records if bounded else scanner.files_data
+    try:
+        if control.is_cancelled() or not records or (bounded and not records.count):
+            return 1
+        return _copy_scanned_groups(args, control, records)
+    finally:
+        if bounded and records is not None:
+            records.close() # Removes the sorted run files
+
+
+def _copy_scanned_groups(args, control, records):
+    def copy_batch(groups, names):
+        outcome = {}
+        worker = FileCopyWorker(groups, args.dest, names, move=args.move,
+                                archive_format=args.output, control=control)
+        worker.progress.connect(lambda _cur, _tot, msg: print(msg))
+        worker.finished.connect(lambda ok, msg: (outcome.update(ok=ok), print(msg)))
+        worker.run()
+        return outcome.get('ok', False)
+
+    if args.memory_budget <= 0:
+        if args.group_key:
+            keyed = group_files_by_key(records, GROUPING_KEYS[args.group_key](args.group_key_option),
+                                       args.threshold if args.group_key_time else None)
+            groups, keys = [g for _, g in keyed], [k for k, _ in keyed]
+        else:
+            groups = list(iter_time_groups(records, args.threshold))
+            keys = [None] * len(groups)
+        print(f"{len(groups)} groups formed.")
+        names = [folder_name_for(args.pattern, i + 1, key) for i, key in enumerate(keys)]
+        paths = [[fi['path'] for fi in g] for g in groups]
+        if args.export_plan:
+            plan = CopyPlan.from_groups(paths, names, args.dest, args.move, args.plan_shards)
+            plan.save(Path(args.export_plan))
+            print(f"Plan with {len(plan.entries)} files in {plan.shards} shards written to {args.export_plan}.")
+            return 0
+        return 0 if copy_batch(paths, names) else 1
+
+    # Groups stream out of the merged runs and are copied in batches of
+    # roughly `memory_budget` files, so memory stays bounded end to end. A
+    # group larger than the budget spans batches under the same folder name.
+    ok, num, batch, names, batch_files = True, 0, [], [], 0
+    for num, chunk in iter_time_group_chunks(records, args.threshold, args.memory_budget):
+        batch.append([fi['path'] for fi in chunk]); names.append(folder_name_for(args.pattern, num))
+        batch_files += len(chunk)
+        if batch_files >= args.memory_budget:
+            ok = copy_batch(batch, names) and ok
+            batch, names, batch_files = [], [], 0
+            if control.is_cancelled():
+                return 1
+    if batch:
+        ok = copy_batch(batch, names) and ok
+    print(f"{num} groups formed and processed.")
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.plan_status:
+        sys.exit(print_plan_status(args.plan_status))
+    if args.run_plan:
+        if 0 < args.reclaim_after < 3 * PLAN_HEARTBEAT_SECONDS:
+            sys.exit(f"--reclaim-after must be at least {3 * PLAN_HEARTBEAT_SECONDS} seconds; "
+                     f"running shards renew their claim every {PLAN_HEARTBEAT_SECONDS}s.")
+        sys.exit(run_plan_headless(args))
+    if args.source or args.dest:
+        if not (args.source and args.dest):
+            sys.exit("Headless mode needs both --source and --dest.")
+        if args.export_plan and (args.memory_budget or args.output != "folder"):
+            sys.exit("--export-plan needs folder output and the groups in memory (no --memory-budget).")
+        if args.timestamp == "content" and args.content_regex.strip():
+            try:
+                re.compile(args.content_regex.strip())
+            except re.error as e:
+                sys.exit(f"Timestamp regex is invalid: {e}")
+        if args.move and args.output != "folder":
+            sys.exit("--move only works with folder output; archives always copy.")
+        if args.group_key and (args.memory_budget or args.watch):
+            sys.exit("--group-key needs the groups in memory; it cannot be combined with --memory-budget or --watch.")
+        try:
+            if args.group_key:
+                GROUPING_KEYS[args.group_key](args.group_key_option)
+        except ValueError as e:
+            sys.exit(str(e))
+        if args.watch:
+            sys.exit(run_watch(args))
+        sys.exit(run_headless(args))
     app = QApplication(sys.argv)
     sorter = FileCascadeApp()
+    if args.benchmark_startup:
+        def report(ms):
+            print(f"startup time_to_first_window_ms={ms:.1f}", flush=True)
+            app.quit()
+        sorter.startup_finished.connect(report)
     sorter.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
+
+
+# --- Application ---
+if __name__ == '__main__':
+    if getattr(sys, 'frozen', False):
+        from multiprocessing import freeze_support
+        freeze_support() # Worker processes re-enter the frozen executable
+    main()
\ No newline at end of file